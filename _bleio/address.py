@@ -42,6 +42,8 @@ class Address:
 
         self._string = string
         self._address_bytes = None
+        # Computed on demand by _key.
+        self._canonical_key: Union[int, str, None] = None
 
         if address:
             self._address_bytes = bytes(address)
@@ -78,6 +80,30 @@ class Address:
                 raise ValueError("address_bytes not available; use self.string")
         return self._address_bytes
 
+    @property
+    def _key(self) -> Union[int, str]:
+        """Canonical form of the address, for use as a dictionary key. It is the same
+        however the address was given: the 48-bit MAC address as an int, or if the address
+        is not a MAC address (it is a UUID on MacOS), the upper-case string.
+        The address type is not included.
+        """
+        if self._canonical_key is None:
+            if self._address_bytes:
+                self._canonical_key = int.from_bytes(self._address_bytes, "little")
+            else:
+                self._canonical_key = self._key_from_string(self._string)
+        return self._canonical_key
+
+    @classmethod
+    def _key_from_string(cls, string: str) -> Union[int, str]:
+        """The `_key` for an address given as a string, such as a bleak address,
+        without creating an Address.
+        """
+        if cls._MAC_ADDRESS_RE.fullmatch(string):
+            # The string is most-significant byte first.
+            return int(string.replace(":", "").replace("-", ""), 16)
+        return string.upper()
+
     @property
     def type(self) -> int:
         """Address type."""
@@ -86,16 +112,11 @@ class Address:
     def __eq__(self, other: Any) -> bool:
         """True if addresses are equivalent."""
         if isinstance(other, Address):
-            if self.type != other.type:
-                return False
-            if self._address_bytes:
-                return self.address_bytes == other.address_bytes
-            if self._string:
-                return self._string == other._string
+            return self.type == other.type and self._key == other._key
         return False
 
     def __hash__(self) -> int:
-        return hash(self.string) ^ hash(self.type)
+        return hash(self._key)
 
     def __repr__(self) -> str:
         return f'Address(string="{self.string}")'
@@ -10,18 +10,17 @@ _bleio implementation for Adafruit_Blinka_bleio
 * Author(s): Dan Halbert for Adafruit Industries
 """
 from __future__ import annotations
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 
-import asyncio
-import queue
+import threading
 import time
 
-from _bleio.common import adapter, Characteristic
+from _bleio.common import Characteristic
 
 Buf = Union[bytes, bytearray, memoryview]
 
 
-class CharacteristicBuffer:
+class CharacteristicBuffer:  # pylint: disable=too-many-instance-attributes
     """Accumulates a Characteristic's incoming values in a FIFO buffer."""
 
     def __init__(
@@ -44,21 +43,63 @@ class CharacteristicBuffer:
         self._characteristic = characteristic
         self._timeout = timeout
         self._buffer_size = buffer_size
-        self._queue = queue.Queue(buffer_size)
+        # Ring buffer: _count unread bytes, starting at _read_index.
+        self._buffer = bytearray(buffer_size)
+        self._buffer_view = memoryview(self._buffer)
+        self._read_index = 0
+        self._count = 0
+        # Notifications arrive in the bleak thread. Readers wait on this
+        # until new data arrives.
+        self._data_available = threading.Condition()
         characteristic._add_notify_callback(self._notify_callback)
 
     def _notify_callback(self, data: Buf) -> None:
-        # Add data bytes to queue, one at a time.
-        if self._queue.full():
-            # Discard oldest data to make room.
-            while self._queue.qsize() > len(data):
-                self._queue.get_nowait()
-
-        for data_byte in data:
-            try:
-                self._queue.put_nowait(data_byte)
-            except queue.Full:
-                return
+        data = memoryview(data)
+        size = self._buffer_size
+        if len(data) > size:
+            # Only the newest data will fit.
+            data = data[-size:]
+        data_len = len(data)
+        with self._data_available:
+            overflow = self._count + data_len - size
+            if overflow > 0:
+                # Discard oldest data to make room.
+                self._advance(overflow)
+            write_index = (self._read_index + self._count) % size
+            first_len = min(data_len, size - write_index)
+            self._buffer_view[write_index : write_index + first_len] = data[:first_len]
+            self._buffer_view[: data_len - first_len] = data[first_len:]
+            self._count += data_len
+            self._data_available.notify_all()
+
+    def _segments(self, nbytes: int) -> Tuple[memoryview, memoryview]:
+        """Return views of the oldest ``nbytes`` unread bytes, as two pieces
+        because the data may wrap around the end of the ring buffer.
+        The second piece is empty if it doesn't. Caller must hold ``self._data_available``.
+        """
+        first_len = min(nbytes, self._buffer_size - self._read_index)
+        return (
+            self._buffer_view[self._read_index : self._read_index + first_len],
+            self._buffer_view[: nbytes - first_len],
+        )
+
+    def _advance(self, nbytes: int) -> None:
+        """Discard the oldest ``nbytes`` unread bytes. Caller must hold ``self._data_available``."""
+        self._read_index = (self._read_index + nbytes) % self._buffer_size
+        self._count -= nbytes
+
+    def _newline_length(self) -> int:
+        """Return the number of unread bytes up to and including the first newline,
+        or 0 if there is no newline. Caller must hold ``self._data_available``.
+        """
+        first, second = self._segments(self._count)
+        idx = self._buffer.find(b"\n", self._read_index, self._read_index + len(first))
+        if idx >= 0:
+            return idx - self._read_index + 1
+        idx = self._buffer.find(b"\n", 0, len(second))
+        if idx >= 0:
+            return len(first) + idx + 1
+        return 0
 
     def read(self, nbytes: Optional[int] = None) -> Union[Buf, None]:
         """Read characters.  If ``nbytes`` is specified then read at most that many
@@ -81,16 +122,22 @@ class CharacteristicBuffer:
 
         :return: number of bytes read and stored into ``buf``
         """
+        buf = memoryview(buf)
         length = len(buf)
         idx = 0
-        end = time.time() + self._timeout
-        while idx < length and time.time() < end:
-            try:
-                buf[idx] = self._queue.get_nowait()
-                idx += 1
-            except queue.Empty:
-                # Let the BLE code run for a bit, and try again.
-                adapter.await_bleak(asyncio.sleep(0.1))
+        end = time.monotonic() + self._timeout
+        with self._data_available:
+            while True:
+                nbytes = min(length - idx, self._count)
+                for segment in self._segments(nbytes):
+                    buf[idx : idx + len(segment)] = segment
+                    idx += len(segment)
+                self._advance(nbytes)
+                remaining = end - time.monotonic()
+                if idx >= length or remaining <= 0:
+                    break
+                # Wait for more data to arrive, or time out.
+                self._data_available.wait(remaining)
 
         return idx
 
@@ -102,31 +149,35 @@ class CharacteristicBuffer:
         :return: the line read
         """
         line = bytearray()
-        end = time.time() + self._timeout
-        while time.time() < end:
-            try:
-                line_byte = self._queue.get_nowait()
-                line.append(line_byte)
-            except queue.Empty:
-                # Let the BLE code run for a bit, and try again.
-                adapter.await_bleak(asyncio.sleep(0.1))
-                continue
-            if line_byte == 0x0A:  # newline
-                break
+        end = time.monotonic() + self._timeout
+        with self._data_available:
+            while True:
+                nbytes = self._newline_length()
+                found_newline = nbytes > 0
+                if not found_newline:
+                    nbytes = self._count
+                for segment in self._segments(nbytes):
+                    line += segment
+                self._advance(nbytes)
+                remaining = end - time.monotonic()
+                if found_newline or remaining <= 0:
+                    break
+                # Wait for more data to arrive, or time out.
+                self._data_available.wait(remaining)
 
         return line
 
     @property
     def in_waiting(self) -> int:
         """The number of bytes in the input buffer, available to be read"""
-        return self._queue.qsize()
+        return self._count
 
     def reset_input_buffer(
         self,
     ) -> None:
         """Discard any unread characters in the input buffer."""
-        while not self._queue.empty():
-            self._queue.get_nowait()
+        with self._data_available:
+            self._advance(self._count)
 
     def deinit(
         self,
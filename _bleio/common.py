@@ -9,38 +9,70 @@ _bleio implementation for Adafruit_Blinka_bleio
 
 * Author(s): Dan Halbert for Adafruit Industries
 """
+# pylint: disable=too-many-lines
 from __future__ import annotations
-from typing import Callable, Iterable, List, Optional, Tuple, Set, Union
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Set,
+    Union,
+)
 
 import asyncio
 import atexit
+import concurrent.futures
 import platform
+import re
+import socket
 import threading
 import time
 
 from bleak import BleakClient, BleakScanner  # type: ignore[import]
-from bleak.backends.characteristic import (  # type: ignore[import]
-    BleakGATTCharacteristic,
-    GattCharacteristicsFlags,
-)
+from bleak.backends.characteristic import BleakGATTCharacteristic  # type: ignore[import]
 from bleak.backends.device import BLEDevice  # type: ignore[import]
 from bleak.backends.scanner import AdvertisementData  # type: ignore[import]
 from bleak.backends.service import BleakGATTService  # type: ignore[import]
+from bleak.exc import BleakError  # type: ignore[import]
 
 
 from _bleio.address import Address
 from _bleio.attribute import Attribute
 from _bleio.exceptions import BluetoothError
-from _bleio.scan_entry import ScanEntry
+from _bleio import hci
+from _bleio.scan_buffer import _DeviceCache, _ScanBuffer
+from _bleio.scan_entry import ScanEntry, _PrefixMatcher
 from _bleio.uuid_ import UUID
 
 if platform.system() == "Linux":
-    import re
     import signal
     import subprocess
 
 Buf = Union[bytes, bytearray, memoryview]
 
+
+async def _gather_limited(coros: Iterable, limit: Optional[int]) -> List:
+    """Await the given coroutines concurrently, with at most ``limit`` running at once
+    (no limit if ``None``). Return their results in order. An exception raised by
+    a coroutine is returned in place of its result.
+    """
+    if limit is None:
+        return await asyncio.gather(*coros, return_exceptions=True)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(
+        *(limited(coro) for coro in coros), return_exceptions=True
+    )
+
+
 # Singleton _bleio.adapter is defined after class Adapter.
 adapter = None  # pylint: disable=invalid-name
 
@@ -48,39 +80,59 @@ adapter = None  # pylint: disable=invalid-name
 class Adapter:  # pylint: disable=too-many-instance-attributes
     """Singleton _bleio.adapter is defined after class Adapter."""
 
-    # Do blocking scans in chunks of this interval.
+    # Check for a scan timeout or stop_scan() at least this often.
     _SCAN_INTERVAL = 0.25
 
+    # Maximum number of scan results waiting to be consumed by start_scan().
+    _SCAN_BUFFER_SIZE = 1024
+
+    # Remember up to this many recently scanned devices, for this many seconds,
+    # so that connecting to them does not require another scan.
+    _DEVICE_CACHE_SIZE = 256
+    _DEVICE_CACHE_TTL = 300
+
+    # Raw HCI socket scanning uses this Bluetooth controller: 0 is hci0.
+    _HCI_DEVICE_ID = 0
+
     def __init__(self):
         if adapter:
             raise RuntimeError("Use the singleton _bleio.adapter")
         self._name = platform.node()
-        # Unbounded FIFO for scan results
         self._scanning_in_progress = False
+        # Holds results for the current or most recent scan.
+        self._scan_buffer: Optional[_ScanBuffer] = None
+        # Reads hcitool or HCI socket scan results into _scan_buffer.
+        self._scan_thread: Optional[threading.Thread] = None
         # Created on demand in self._bleak_thread context.
         self._scanner = None
-        self._connections = []
+        # Current connections, by address key.
+        self._connections: Dict[Union[int, str], Connection] = {}
+        # Connections being made, by address key.
+        self._pending_connections: Dict[Union[int, str], asyncio.Task] = {}
+        # The bleak thread and its event loop are not started until first needed,
+        # so that importing _bleio is cheap.
         self._bleak_loop = None
-        self._bleak_thread = threading.Thread(target=self._run_bleak_loop)
-        # Discard thread quietly on exit.
-        self._bleak_thread.daemon = True
-        self._bleak_thread_ready = threading.Event()
-        self._bleak_thread.start()
-        # Wait for thread to start.
-        self._bleak_thread_ready.wait()
+        self._bleak_thread = None
+        self._bleak_thread_lock = threading.Lock()
 
         # Not known yet.
         self._hcitool_is_usable = None
         self._hcitool = None
         self._hcidump = None
         self.ble_backend = None
+        # What to do with new scan results when start_scan() is not consuming them
+        # fast enough. See _ScanBuffer.
+        self.scan_overflow_policy = "drop_oldest"
+        # If True, connect() asks bleak to use cached services instead of discovering them.
+        # On Linux this is bleak's in-memory cache, which is never checked for staleness.
+        # See _connect_async() and the README.
+        self.gatt_cache = False
 
         # Keep a cache of recently scanned devices, to avoid doing double
         # device scanning.
-        self._cached_devices = {}
-
-        # Clean up connections, etc. when exiting (even by KeyboardInterrupt)
-        atexit.register(self._cleanup)
+        self._cached_devices = _DeviceCache(
+            self._DEVICE_CACHE_SIZE, self._DEVICE_CACHE_TTL
+        )
 
     def _cleanup(self) -> None:
         """Clean up connections, so that the underlying OS software does not
@@ -88,7 +140,7 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
         """
         # Use a copy of the list because each connection will be deleted
         # on disconnect().
-        for connection in self._connections.copy():
+        for connection in tuple(self._connections.values()):
             connection.disconnect()
 
     @property
@@ -116,8 +168,8 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
                     # no hcitool, no privileges (causes non-zero return code), too slow, etc.
                     pass
             if self.ble_backend:
-                if self.ble_backend == "bleak":
-                    # User requests bleak, so ignore hcitool.
+                if self.ble_backend in ("bleak", "hci_socket"):
+                    # User requests another backend, so ignore hcitool.
                     self._hcitool_is_usable = False
                 elif self.ble_backend == "hcitool":
                     if not self._hcitool_is_usable:
@@ -127,22 +179,64 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
                         )
                 else:
                     raise ValueError(
-                        "ble_backend setting not recognized. Should be 'hcitool' or 'bleak'."
+                        "ble_backend setting not recognized. "
+                        "Should be 'hcitool', 'hci_socket' or 'bleak'."
                     )
 
         return self._hcitool_is_usable
 
-    def _run_bleak_loop(self) -> None:
+    @property
+    def _use_hci_socket(self) -> bool:
+        """Determines whether to scan using a raw HCI socket, which must be requested
+        explicitly by setting ble_backend.
+        """
+        # Checking _use_hcitool validates the ble_backend setting.
+        return not self._use_hcitool and self.ble_backend == "hci_socket"
+
+    def _run_bleak_loop(self, ready: threading.Event) -> None:
         self._bleak_loop = asyncio.new_event_loop()
         # Event loop is now available.
-        self._bleak_thread_ready.set()
+        ready.set()
         self._bleak_loop.run_forever()
 
+    def _start_bleak_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the bleak thread if it is not already running, and return its event loop."""
+        if self._bleak_loop is None:
+            with self._bleak_thread_lock:
+                # Check again: another thread may have started it while we waited.
+                if self._bleak_loop is None:
+                    ready = threading.Event()
+                    self._bleak_thread = threading.Thread(
+                        target=self._run_bleak_loop, args=(ready,)
+                    )
+                    # Discard thread quietly on exit.
+                    self._bleak_thread.daemon = True
+                    self._bleak_thread.start()
+                    # Wait for thread to start.
+                    ready.wait()
+                    # Clean up connections, etc. when exiting (even by KeyboardInterrupt)
+                    atexit.register(self._cleanup)
+        return self._bleak_loop
+
+    def _submit_bleak(self, coro) -> concurrent.futures.Future:
+        """Schedule an async routine in the bleak thread and return a Future for its result,
+        without waiting.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._start_bleak_loop())
+
     def await_bleak(self, coro, timeout: Optional[float] = None):
         """Call an async routine in the bleak thread from sync code, and await its result."""
-        # This is a concurrent.Future.
-        future = asyncio.run_coroutine_threadsafe(coro, self._bleak_loop)
-        return future.result(timeout)
+        return self._submit_bleak(coro).result(timeout)
+
+    async def await_bleak_async(self, coro):
+        """Call an async routine in the bleak thread from async code, and await its result.
+        If the caller is already running in the bleak event loop, the routine is awaited
+        directly. Otherwise it is scheduled on the bleak loop and awaited without blocking
+        the caller's event loop. (Blinka _bleio only)
+        """
+        if asyncio.get_running_loop() is self._start_bleak_loop():
+            return await coro
+        return await asyncio.wrap_future(self._submit_bleak(coro))
 
     @property
     def enabled(self) -> bool:
@@ -197,7 +291,7 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
         """Stop sending advertising packets."""
         raise NotImplementedError("Advertising not implemented")
 
-    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
     def start_scan(
         self,
         prefixes: Buf = b"",
@@ -205,10 +299,11 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
         buffer_size: int = 512,  # pylint: disable=unused-argument
         extended: bool = False,  # pylint: disable=unused-argument
         timeout: Optional[float] = None,
-        interval: float = 0.1,  # pylint: disable=unused-argument
-        window: float = 0.1,  # pylint: disable=unused-argument
+        interval: float = 0.1,
+        window: float = 0.1,
         minimum_rssi: int = -80,
         active: bool = True,  # pylint: disable=unused-argument
+        coalesce_window: Optional[float] = None,
     ) -> Iterable[ScanEntry]:
         """
         Starts a BLE scan and returns an iterator of results. Advertisements and scan responses are
@@ -228,92 +323,120 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
            window must be <= interval.
         :param int minimum_rssi: the minimum rssi of entries to return.
         :param bool active: retrieve scan responses for scannable advertisements.
+        :param float coalesce_window: If not None, merge all the results from each address
+           that arrive within this many seconds of its first one, and return a single
+           ``ScanEntry`` at the end of that time. The entry has the latest RSSI,
+           along with the minimum, maximum, and mean RSSI, and any scan response data is
+           merged into the advertisement. (Blinka _bleio only)
         :returns: an iterable of ``ScanEntry`` objects
         :rtype: iterable"""
 
-        # Remember only the most recently advertised devices.
-        # In the future, we might remember these for a few minutes.
-        self._clear_device_cache()
-
-        if self._use_hcitool:
-            yield from self._start_scan_hcitool(
-                prefixes,
-                timeout=timeout,
-                minimum_rssi=minimum_rssi,
-                active=active,
+        if self.scan_overflow_policy not in _ScanBuffer.OVERFLOW_POLICIES:
+            raise ValueError(
+                "scan_overflow_policy should be one of: "
+                + ", ".join(_ScanBuffer.OVERFLOW_POLICIES)
             )
-            return
-
+        scan_buffer = _ScanBuffer(self._SCAN_BUFFER_SIZE, self.scan_overflow_policy)
+        self._scan_buffer = scan_buffer
         self._scanning_in_progress = True
+        # When coalescing, entries being merged, by address key, in the order their
+        # windows end: {address key: (window end time, merged entry)}
+        coalescing: Dict[Union[int, str], Tuple[float, ScanEntry]] = {}
 
-        start = time.time()
-        while self._scanning_in_progress and (
-            timeout is None or time.time() - start < timeout
-        ):
-            for device, advertisement_data in self.await_bleak(
-                self._scan_for_interval(self._SCAN_INTERVAL)
-            ):
-                if advertisement_data.rssi < minimum_rssi:
-                    continue
-                self._cache_device(device)
-                scan_entry = ScanEntry._from_bleak(  # pylint: disable=protected-access
-                    device, advertisement_data
+        # pylint: disable=protected-access
+        matcher = ScanEntry._compile_prefixes(bytes(prefixes), match_all=False)
+
+        start = time.monotonic()
+        try:
+            # Scan results are parsed, filtered, and put in scan_buffer as they arrive,
+            # by another thread or by a callback in the bleak thread.
+            if self._use_hcitool:
+                self._start_scan_hcitool(
+                    scan_buffer, matcher, minimum_rssi=minimum_rssi, active=active
+                )
+            elif self._use_hci_socket:
+                self._start_scan_hci_socket(
+                    scan_buffer,
+                    matcher,
+                    interval=interval,
+                    window=window,
+                    minimum_rssi=minimum_rssi,
+                    active=active,
                 )
-                if not scan_entry.matches(prefixes, match_all=False):
+            else:
+                self.await_bleak(
+                    self._start_bleak_scan(scan_buffer, matcher, minimum_rssi)
+                )
+
+            while self._scanning_in_progress:
+                # Return merged entries whose window has ended.
+                now = time.monotonic()
+                ended = []
+                for key, (window_end, _) in coalescing.items():
+                    if window_end > now:
+                        break
+                    ended.append(key)
+                for key in ended:
+                    yield coalescing.pop(key)[1]
+
+                wait_time = self._SCAN_INTERVAL
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        break
+                    wait_time = min(wait_time, remaining)
+                for window_end, _ in coalescing.values():
+                    # Wake up when the first window ends.
+                    wait_time = max(min(wait_time, window_end - time.monotonic()), 0)
+                    break
+                scan_entry = scan_buffer.get(wait_time)
+                if scan_entry is None:
+                    if scan_buffer.closed:
+                        # No more results: for instance, hcidump exited.
+                        break
                     continue
-                yield scan_entry
+                if coalesce_window is None:
+                    yield scan_entry
+                    continue
+                # pylint: disable=protected-access
+                key = scan_entry.address._key
+                if key in coalescing:
+                    coalescing[key][1]._merge(scan_entry)
+                else:
+                    coalescing[key] = (
+                        time.monotonic() + coalesce_window,
+                        scan_entry,
+                    )
 
-    @staticmethod
-    def _parse_hcidump_data(
-        buffered: List[bytes], prefixes: bytes, minimum_rssi: int, active: bool
-    ):
-        # > is controller to host, 04 is for an HCI Event packet, and 3E is an LE meta-event
-        if buffered[0].startswith(b"> 04 3E"):
-            subevent_code = int(buffered[0][11:13], 16)
-            if subevent_code == 0x02:
-                num_reports = int(buffered[0][14:16], 16)
-                if num_reports > 1:
-                    raise NotImplementedError("Multiple packed reports")
-                # Parse RSSI first so we can filter on it.
-                rssi = int(buffered[-1][-4:-2], 16)
-                if rssi > 127:
-                    rssi = (256 - rssi) * -1
-                if rssi == 127 or rssi < minimum_rssi:
-                    return None
-                event_type = int(buffered[0][17:19], 16)
-                # Filter out scan responses if we weren't supposed to active scan.
-                if event_type == 0x04 and not active:
-                    return None
-                address_type = int(buffered[0][20:22], 16)
-                address = bytes.fromhex(buffered[0][23:40].decode("utf-8"))
-                # Mod the address type by two because 2 and 3 are resolved versions of public and
-                # random static.
-                address = Address(address, address_type % 2)
-
-                buffered[0] = buffered[0][43:]
-                buffered[-1] = buffered[-1][:-4]
-                data = bytes.fromhex("".join([x.decode("utf-8") for x in buffered]))
-
-                scan_entry = ScanEntry(
-                    address=address,
-                    rssi=rssi,
-                    advertisement_bytes=data,
-                    connectable=event_type < 0x2,
-                    scan_response=event_type == 0x4,
-                )
-                if scan_entry.matches(prefixes, match_all=False):
-                    return scan_entry
-        return None
+            if self._scanning_in_progress:
+                # The scan timed out or ran out of results, rather than being stopped.
+                # Return what has been merged so far.
+                for _, merged_entry in coalescing.values():
+                    yield merged_entry
+        finally:
+            self.stop_scan()
+
+    @property
+    def dropped_scan_reports(self) -> int:
+        """The number of scan results discarded during the current or most recent scan,
+        because they arrived faster than the `start_scan` iterator consumed them.
+        Which results are discarded is set by ``scan_overflow_policy``:
+        ``"drop_oldest"`` (the default), ``"drop_newest"``, or ``"coalesce"``,
+        which replaces the newest waiting result from the same address if there is one.
+        (Blinka _bleio only)
+        """
+        return self._scan_buffer.dropped if self._scan_buffer else 0
 
     def _start_scan_hcitool(
         self,
-        prefixes: Buf,
+        scan_buffer: _ScanBuffer,
+        matcher: _PrefixMatcher,
         *,
-        timeout: Optional[float],
         minimum_rssi: int,
         active: bool,
-    ) -> Iterable:
-        """hcitool scanning (only on Linux)"""
+    ) -> None:
+        """Start hcitool scanning (only on Linux), and a thread that puts the results
+        into scan_buffer."""
         # hcidump outputs the full advertisement data, assuming it's run privileged.
         # Since hcitool is privileged, we assume hcidump is too.
         # pylint: disable=consider-using-with
@@ -332,45 +455,95 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
                 stderr=subprocess.DEVNULL,
             )
         # pylint: enable=consider-using-with
-        # Throw away the first two output lines of hcidump because they are version info.
-        self._hcidump.stdout.readline()  # type: ignore[union-attr]
-        self._hcidump.stdout.readline()  # type: ignore[union-attr]
-        returncode = self._hcidump.poll()
-        start_time = time.monotonic()
-        buffered: List[bytes] = []
-        while returncode is None and (
-            timeout is None or time.monotonic() - start_time < timeout
-        ):
-            line = self._hcidump.stdout.readline()  # type: ignore[union-attr]
-            # print(line, line[0])
-            if line[0] != 32:  # 32 is ascii for space
-                if buffered:
-                    parsed = self._parse_hcidump_data(
-                        buffered, prefixes, minimum_rssi, active
-                    )
-                    if parsed:
-                        yield parsed
-                    buffered.clear()
-            buffered.append(line)
-            returncode = self._hcidump.poll()
-        self.stop_scan()
-
-    async def _scan_for_interval(
-        self, interval: float
-    ) -> Tuple[BLEDevice, AdvertisementData]:
-        """Scan advertisements for the given interval and tuples (device, advertisement_data)
-        for all advertisements heard.
+        # Drain hcidump's output continuously, so it never blocks on a full pipe,
+        # however slowly the scan results are consumed.
+        # pylint: disable=protected-access
+        self._scan_thread = threading.Thread(
+            target=hci._read_hcidump,
+            args=(self._hcidump.stdout, scan_buffer, matcher, minimum_rssi, active),
+            daemon=True,
+        )
+        self._scan_thread.start()
+
+    def _start_scan_hci_socket(
+        self,
+        scan_buffer: _ScanBuffer,
+        matcher: _PrefixMatcher,
+        *,
+        interval: float,
+        window: float,
+        minimum_rssi: int,
+        active: bool,
+    ) -> None:
+        """Start raw HCI socket scanning (only on Linux), and a thread that puts the results
+        into scan_buffer."""
+        try:
+            hci_socket = socket.socket(  # pylint: disable=no-member
+                socket.AF_BLUETOOTH, socket.SOCK_RAW, socket.BTPROTO_HCI
+            )
+        except (AttributeError, OSError) as error:
+            raise EnvironmentError(
+                "ble_backend set to 'hci_socket', but a raw HCI socket is unavailable"
+            ) from error
+
+        # pylint: disable=protected-access
+        try:
+            hci._start_hci_socket_scan(
+                hci_socket,
+                self._HCI_DEVICE_ID,
+                interval=interval,
+                window=window,
+                active=active,
+            )
+        except OSError as error:
+            hci_socket.close()
+            raise EnvironmentError(
+                "ble_backend set to 'hci_socket', but scanning could not be started"
+            ) from error
+
+        self._scan_thread = threading.Thread(
+            target=hci._run_hci_socket_scan,
+            args=(
+                hci_socket,
+                scan_buffer,
+                matcher,
+                minimum_rssi,
+                active,
+                self._SCAN_INTERVAL,
+            ),
+            daemon=True,
+        )
+        self._scan_thread.start()
+
+    async def _start_bleak_scan(
+        self, scan_buffer: _ScanBuffer, matcher: _PrefixMatcher, minimum_rssi: int
+    ) -> None:
+        """Start a continuous bleak scan that puts scan entries into scan_buffer
+        as advertisements are heard.
         """
-        if not self._scanner:
-            self._scanner = BleakScanner(loop=self._bleak_loop)
 
+        def detection_callback(
+            device: BLEDevice, advertisement_data: AdvertisementData
+        ) -> None:
+            # Called in the bleak thread.
+            if advertisement_data.rssi < minimum_rssi:
+                return
+            self._cache_device(device)
+            scan_entry = ScanEntry._from_bleak(  # pylint: disable=protected-access
+                device, advertisement_data
+            )
+            if matcher.matches(scan_entry):
+                scan_buffer.put(scan_entry)
+
+        self._scanner = BleakScanner(detection_callback=detection_callback)
         await self._scanner.start()
-        await asyncio.sleep(interval)
-        await self._scanner.stop()
-        return self._scanner.discovered_devices_and_advertisement_data.values()
 
     def stop_scan(self) -> None:
         """Stop scanning before timeout may have occurred."""
+        self._scanning_in_progress = False
+        if self._scan_buffer:
+            # Tells the scan thread, if any, to stop.
+            self._scan_buffer.close()
         if self._use_hcitool:
             if self._hcitool:
                 if self._hcitool.poll() is None:
@@ -382,8 +555,12 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
                     self._hcidump.send_signal(signal.SIGINT)
                     self._hcidump.wait()
                 self._hcidump = None
-        self._scanning_in_progress = False
-        self._scanner = None
+        if self._scanner:
+            self.await_bleak(self._scanner.stop())
+            self._scanner = None
+        if self._scan_thread and self._scan_thread is not threading.current_thread():
+            self._scan_thread.join()
+            self._scan_thread = None
 
     @property
     def connected(self) -> bool:
@@ -391,50 +568,158 @@ class Adapter:  # pylint: disable=too-many-instance-attributes
 
     @property
     def connections(self) -> Iterable[Connection]:
-        return tuple(self._connections)
+        return tuple(self._connections.values())
 
     def connect(self, address: Address, *, timeout: float) -> None:
         return self.await_bleak(self._connect_async(address, timeout=timeout))
 
+    async def connect_async(self, address: Address, *, timeout: float) -> Connection:
+        """Coroutine version of `connect`, usable from any event loop. (Blinka _bleio only)"""
+        return await self.await_bleak_async(
+            self._connect_async(address, timeout=timeout)
+        )
+
+    def connect_many(
+        self,
+        addresses: Iterable[Address],
+        *,
+        timeout: float,
+        max_concurrency: int = 4,
+    ) -> Tuple[Union[Connection, Exception], ...]:
+        """Connect to several devices concurrently. (Blinka _bleio only)
+
+        :param iterable addresses: the `Address` of each device to connect to
+        :param float timeout: the timeout for each individual connection
+        :param int max_concurrency: the maximum number of connections attempted at once
+        :return: one item per address, in the same order: the new `Connection`,
+          or the exception raised while trying to connect to that address.
+        """
+        return self.await_bleak(
+            self._connect_many_async(
+                addresses, timeout=timeout, max_concurrency=max_concurrency
+            )
+        )
+
+    async def connect_many_async(
+        self,
+        addresses: Iterable[Address],
+        *,
+        timeout: float,
+        max_concurrency: int = 4,
+    ) -> Tuple[Union[Connection, Exception], ...]:
+        """Coroutine version of `connect_many`, usable from any event loop.
+        (Blinka _bleio only)"""
+        return await self.await_bleak_async(
+            self._connect_many_async(
+                addresses, timeout=timeout, max_concurrency=max_concurrency
+            )
+        )
+
+    async def _connect_many_async(
+        self,
+        addresses: Iterable[Address],
+        *,
+        timeout: float,
+        max_concurrency: int,
+    ) -> Tuple[Union[Connection, Exception], ...]:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        return tuple(
+            await _gather_limited(
+                (
+                    self._connect_async(address, timeout=timeout)
+                    for address in addresses
+                ),
+                max_concurrency,
+            )
+        )
+
     # pylint: disable=protected-access
     async def _connect_async(self, address: Address, *, timeout: float) -> Connection:
+        """Return the live connection to address if there is one. Otherwise connect, or
+        wait for a connection to address that is already being made.
+        """
+        connection = self._connections.get(address._key)
+        if connection is not None and connection.connected:
+            return connection
+        pending = self._pending_connections.get(address._key)
+        if pending is None:
+            pending = asyncio.create_task(
+                self._new_connection_async(address, timeout=timeout)
+            )
+            self._pending_connections[address._key] = pending
+            pending.add_done_callback(
+                lambda _: self._pending_connections.pop(address._key, None)
+            )
+        # Shield the connection from cancellation, since another caller may be waiting for it.
+        return await asyncio.shield(pending)
+
+    async def _new_connection_async(
+        self, address: Address, *, timeout: float
+    ) -> Connection:
         device = self._cached_device(address)
         # Use cached device if possible, to avoid having BleakClient do
         # a scan again.
-        client = BleakClient(device if device else address._bleak_address)
+        client = BleakClient(
+            device if device else address._bleak_address,
+            # Read services from Windows' attribute cache instead of the device.
+            winrt={"use_cached_services": True} if self.gatt_cache else {},
+        )
         # connect() takes a timeout, but it's a timeout to do a
         # discover() scan, not an actual connect timeout.
         try:
-            await client.connect(timeout=timeout)
+            # On Linux, dangerous_use_bleak_cache makes bleak return the services it built
+            # for this peer earlier in this process, without waiting for BlueZ to resolve
+            # them and without checking the Database Hash, so they may be stale.
+            # CoreBluetooth ignores it.
+            await client.connect(
+                timeout=timeout, dangerous_use_bleak_cache=self.gatt_cache
+            )
             # This does not seem to connect reliably.
             # await asyncio.wait_for(client.connect(), timeout)
         except asyncio.TimeoutError:
             raise BluetoothError("Failed to connect: timeout") from asyncio.TimeoutError
 
         connection = Connection._from_bleak(address, client)
-        self._connections.append(connection)
+        await connection._update_mtu_async()
+        self._connections[address._key] = connection
         return connection
 
     def delete_connection(self, connection: Connection) -> None:
         """Remove the specified connection of the list of connections held by the adapter.
         (Blinka _bleio only).
         """
-        self._connections.remove(connection)
+        # pylint: disable=protected-access
+        if self._connections.get(connection._address._key) is connection:
+            del self._connections[connection._address._key]
 
     def erase_bonding(self) -> None:
         raise NotImplementedError(
             "Use the host computer's BLE comamnds to reset bonding information"
         )
 
+    @property
+    def device_cache_stats(self) -> Dict[str, int]:
+        """Counts of ``"hits"``, ``"misses"``, and ``"evictions"`` for the cache of recently
+        scanned devices that is used to connect without scanning again. (Blinka _bleio only)
+        """
+        return {
+            "hits": self._cached_devices.hits,
+            "misses": self._cached_devices.misses,
+            "evictions": self._cached_devices.evictions,
+        }
+
     def _cached_device(self, address: Address) -> Optional[BLEDevice]:
         """Return a device recently found during scanning with the given address."""
-        return self._cached_devices.get(address)
+        # pylint: disable=protected-access
+        return self._cached_devices.get(address._key)
 
     def _clear_device_cache(self) -> None:
         self._cached_devices.clear()
 
     def _cache_device(self, device: BLEDevice) -> None:
-        self._cached_devices[device.address] = device
+        # pylint: disable=protected-access
+        self._cached_devices.put(Address._key_from_string(device.address), device)
 
 
 # Create adapter singleton.
@@ -460,6 +745,16 @@ class Characteristic:
     WRITE_NO_RESPONSE = 0x20
     """property: clients may write this characteristic; no response will be sent back"""
 
+    # bleak property names, and the corresponding _bleio property bits.
+    _BLEAK_PROPERTIES = {
+        "broadcast": BROADCAST,
+        "indicate": INDICATE,
+        "notify": NOTIFY,
+        "read": READ,
+        "write": WRITE,
+        "write-without-response": WRITE_NO_RESPONSE,
+    }
+
     # pylint: disable=too-many-arguments
     def __init__(
         self,
@@ -545,7 +840,8 @@ class Characteristic:
     ) -> "Characteristic":
         properties = 0
         for prop in _bleak_characteristic.properties:
-            properties |= GattCharacteristicsFlags[prop.replace("-", "_")].value
+            # Ignore properties that _bleio does not represent.
+            properties |= cls._BLEAK_PROPERTIES.get(prop, 0)
         charac = Characteristic.add_to_service(
             service=service,
             uuid=UUID(_bleak_characteristic.uuid),
@@ -580,22 +876,43 @@ class Characteristic:
     @property
     def value(self) -> Union[bytes, None]:
         """The value of this characteristic."""
-        return adapter.await_bleak(
-            # pylint: disable=protected-access
-            self.service.connection._bleak_client.read_gatt_char(self.uuid._bleak_uuid)
-        )
+        return adapter.await_bleak(self._read_async())
 
     @value.setter
     def value(self, val) -> None:
-        adapter.await_bleak(
-            # BlueZ DBus cannot take a bytes here, though it can take a tuple, etc.
-            # So use a bytearray.
-            # pylint: disable=protected-access
-            self.service.connection._bleak_client.write_gatt_char(
-                self.uuid._bleak_uuid,
-                bytearray(val),
-                response=self.properties & Characteristic.WRITE,
-            )
+        adapter.await_bleak(self._write_async(val))
+
+    async def read_async(self) -> Union[bytes, None]:
+        """Coroutine version of reading `value`, usable from any event loop.
+        (Blinka _bleio only)"""
+        return await adapter.await_bleak_async(self._read_async())
+
+    async def write_async(self, val: Buf) -> None:
+        """Coroutine version of setting `value`, usable from any event loop.
+        (Blinka _bleio only)"""
+        await adapter.await_bleak_async(self._write_async(val))
+
+    async def _read_async(self) -> Union[bytes, None]:
+        # Pass bleak its own characteristic object, so it need not look it up, and so
+        # characteristics with the same UUID are told apart.
+        # pylint: disable=protected-access
+        return await self.service.connection._bleak_client.read_gatt_char(
+            self._bleak_gatt_characteristic
+        )
+
+    async def _write_async(self, val: Buf, *, response: Optional[bool] = None) -> None:
+        """Write val. If response is None, ask for a response if the characteristic
+        supports `WRITE`.
+        """
+        if response is None:
+            response = bool(self.properties & Characteristic.WRITE)
+        # BlueZ DBus cannot take a bytes here, though it can take a tuple, etc.
+        # So use a bytearray.
+        # pylint: disable=protected-access
+        await self.service.connection._bleak_client.write_gatt_char(
+            self._bleak_gatt_characteristic,
+            bytearray(val),
+            response=response,
         )
 
     @property
@@ -616,23 +933,32 @@ class Characteristic:
         :param bool notify: True if Characteristic should receive notifications of remote writes
         :param float indicate: True if Characteristic should receive indications of remote writes
         """
+        adapter.await_bleak(self._set_cccd_async(notify=notify, indicate=indicate))
+
+    async def set_cccd_async(
+        self, *, notify: bool = False, indicate: bool = False
+    ) -> None:
+        """Coroutine version of `set_cccd`, usable from any event loop. (Blinka _bleio only)"""
+        await adapter.await_bleak_async(
+            self._set_cccd_async(notify=notify, indicate=indicate)
+        )
+
+    async def _set_cccd_async(
+        self, *, notify: bool = False, indicate: bool = False
+    ) -> None:
         if indicate:
             raise NotImplementedError("Indicate not available")
 
         # pylint: disable=protected-access
+        connection = self.service.connection
         if notify:
-            adapter.await_bleak(
-                self.service.connection._bleak_client.start_notify(
-                    self._bleak_gatt_characteristic.uuid,
-                    self._notify_callback,
-                )
+            # The connection passes notifications on to the right Characteristic by handle.
+            await connection._bleak_client.start_notify(
+                self._bleak_gatt_characteristic,
+                connection._notify_callback,
             )
         else:
-            adapter.await_bleak(
-                self._service.connection._bleak_client.stop_notify(
-                    self._bleak_gatt_characteristic.uuid
-                )
-            )
+            await connection._bleak_client.stop_notify(self._bleak_gatt_characteristic)
 
     def _add_notify_callback(self, callback: Callable[[Buf], None]):
         """Add a callback to call when a notify happens on this characteristic."""
@@ -642,10 +968,7 @@ class Characteristic:
         """Remove a callback to call when a notify happens on this characteristic."""
         self._notify_callbacks.remove(callback)
 
-    # pylint: disable=unused-argument
-    def _notify_callback(self, handle: Optional[int], data: Buf):
-        # pylint: disable=protected-access
-        # Note: Right now we can't vet the handle, because it may be None.
+    def _notify_callback(self, data: Buf):
         for callback in self._notify_callbacks:
             callback(data)
 
@@ -674,6 +997,9 @@ class Connection:
 
        connection = _bleio.adapter.connect(my_entry.address, timeout=10)"""
 
+    # Bytes of ATT opcode and handle in a notification or write packet.
+    _ATT_HEADER_LENGTH = 3
+
     def __init__(self, address: Address):
         """Connections should not be created directly.
         Instead, to initiate a connection use `_bleio.Adapter.connect`.
@@ -684,6 +1010,15 @@ class Connection:
         """
         self._address = address
         self.__bleak_client = None
+        # Remote Service objects already made, by handle, and the tuples already returned
+        # by discover_remote_services(), by whitelist. They are only good for the
+        # bleak service collection they were made from, which bleak keeps until
+        # disconnecting.
+        self._bleak_services = None
+        self._services: Dict[int, Service] = {}
+        # Remote Characteristic objects, by handle, to pass notifications to.
+        self._characteristics_by_handle: Dict[int, Characteristic] = {}
+        self._service_views: Dict[Optional[FrozenSet[str]], Tuple[Service, ...]] = {}
 
     @classmethod
     def _from_bleak(cls, address: Address, _bleak_client: BleakClient) -> "Connection":
@@ -707,9 +1042,42 @@ class Connection:
         adapter.delete_connection(self)
         adapter.await_bleak(self._disconnect_async())
 
+    async def disconnect_async(self) -> None:
+        """Coroutine version of `disconnect`, usable from any event loop. (Blinka _bleio only)"""
+        adapter.delete_connection(self)
+        await adapter.await_bleak_async(self._disconnect_async())
+
+    async def _update_mtu_async(self) -> None:
+        """Make sure bleak knows the negotiated ATT MTU.
+        BlueZ does not report it until it is explicitly acquired.
+        """
+        # pylint: disable=protected-access
+        backend = getattr(self.__bleak_client, "_backend", None)
+        if getattr(backend, "_mtu_size", 0) is None and hasattr(
+            backend, "_acquire_mtu"
+        ):
+            try:
+                await backend._acquire_mtu()
+            except BleakError:
+                # BlueZ refused, for instance because the device requires bonding first.
+                # Fall back to bleak's default MTU.
+                pass
+            except RuntimeError:
+                # The device has no characteristic that can be used to get the MTU.
+                # bleak's StopIteration is turned into a RuntimeError in a coroutine.
+                pass
+
     async def _disconnect_async(self) -> None:
         """Disconnects from the remote peripheral. Does nothing if already disconnected."""
         await self.__bleak_client.disconnect()
+        self._clear_services()
+
+    def _clear_services(self) -> None:
+        """Forget the remote Service objects made so far."""
+        self._bleak_services = None
+        self._services = {}
+        self._characteristics_by_handle = {}
+        self._service_views = {}
 
     def pair(self, *, bond: bool = True) -> None:
         """Pair to the peer to improve security."""
@@ -722,6 +1090,15 @@ class Connection:
             self._discover_remote_services_async(service_uuids_whitelist)
         )
 
+    async def discover_remote_services_async(
+        self, service_uuids_whitelist: Optional[Iterable] = None
+    ) -> Tuple[Service]:
+        """Coroutine version of `discover_remote_services`, usable from any event loop.
+        (Blinka _bleio only)"""
+        return await adapter.await_bleak_async(
+            self._discover_remote_services_async(service_uuids_whitelist)
+        )
+
     async def _discover_remote_services_async(
         self, service_uuids_whitelist: Optional[Iterable] = None
     ) -> Tuple[Service]:
@@ -745,24 +1122,210 @@ class Connection:
           service or characteristic to be discovered. Creating the UUID causes the UUID to be
           registered for use. (This restriction may be lifted in the future.)
 
+          The same `Service` and `Characteristic` objects are returned on each call,
+          until disconnecting. bleak discovers the peer's services only when connecting,
+          and does not discover them again if the peer indicates that they have changed.
+          Reconnect to get the new services.
+
         :return: A tuple of `Service` objects provided by the remote peripheral.
         """
 
         # Fetch the services.
         bleak_services = self.__bleak_client.services
+        if bleak_services is not self._bleak_services:
+            # First call since connecting.
+            self._clear_services()
+            self._bleak_services = bleak_services
+
+        # Compare bleak's 128-bit UUID strings with the wanted UUIDs as strings,
+        # so no objects are made for unwanted services or their characteristics.
+        wanted_uuids = (
+            frozenset(str(uuid) for uuid in service_uuids_whitelist)
+            if service_uuids_whitelist
+            else None
+        )
+        services = self._service_views.get(wanted_uuids)
+        if services is None:
+            services = tuple(
+                self._service(bleak_service)
+                for bleak_service in bleak_services
+                if wanted_uuids is None or bleak_service.uuid.lower() in wanted_uuids
+            )
+            self._service_views[wanted_uuids] = services
+        return services
+
+    def _service(self, bleak_service: BleakGATTService) -> Service:
+        """Return the Service for bleak_service, making it if necessary."""
+        service = self._services.get(bleak_service.handle)
+        if service is None:
+            # pylint: disable=protected-access
+            service = Service._from_bleak(self, bleak_service)
+            self._services[bleak_service.handle] = service
+            for characteristic in service.characteristics:
+                self._characteristics_by_handle[
+                    characteristic._bleak_gatt_characteristic.handle
+                ] = characteristic
+        return service
+
+    def read_many(
+        self,
+        characteristics: Iterable[Characteristic],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> Tuple[Union[bytes, Exception], ...]:
+        """Read the values of several characteristics of this connection, with the reads
+        all queued at once, instead of waiting for each one before starting the next.
+        (Blinka _bleio only)
+
+        :param iterable characteristics: the remote `Characteristic` objects to read
+        :param int max_concurrency: the maximum number of reads outstanding at once,
+          or ``None`` for no limit
+        :return: one item per characteristic, in the same order: its value,
+          or the exception raised while trying to read it.
+        """
+        return adapter.await_bleak(
+            self._read_many_async(characteristics, max_concurrency=max_concurrency)
+        )
 
+    async def read_many_async(
+        self,
+        characteristics: Iterable[Characteristic],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> Tuple[Union[bytes, Exception], ...]:
+        """Coroutine version of `read_many`, usable from any event loop.
+        (Blinka _bleio only)"""
+        return await adapter.await_bleak_async(
+            self._read_many_async(characteristics, max_concurrency=max_concurrency)
+        )
+
+    async def _read_many_async(
+        self,
+        characteristics: Iterable[Characteristic],
+        *,
+        max_concurrency: Optional[int],
+    ) -> Tuple[Union[bytes, Exception], ...]:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
         # pylint: disable=protected-access
-        if service_uuids_whitelist:
-            filtered_bleak_services = tuple(
-                s for s in bleak_services if UUID(s.uuid) in service_uuids_whitelist
+        return tuple(
+            await _gather_limited(
+                (characteristic._read_async() for characteristic in characteristics),
+                max_concurrency,
             )
-        else:
-            filtered_bleak_services = bleak_services
+        )
 
-        return tuple(
-            Service._from_bleak(self, bleak_service)
-            for bleak_service in filtered_bleak_services
+    def write_many(
+        self,
+        writes: Iterable[Tuple[Characteristic, Buf]],
+        *,
+        ordered: bool = True,
+    ) -> Tuple[Union[float, Exception, None], ...]:
+        """Write values to several characteristics of this connection, with the writes
+        all handed to the bleak thread at once. A write uses write without response
+        when the characteristic allows it. (Blinka _bleio only)
+
+        :param iterable writes: ``(characteristic, data)`` pairs, to write in order
+        :param bool ordered: if True, send the writes back-to-back in order, without waiting
+          for each one to finish before sending the next, and cancel the writes that have
+          not finished when one fails. The last write is acknowledged if the characteristic
+          allows it, which confirms that all the writes arrived. If False, do the writes
+          concurrently, in any order, and do them all even if some fail.
+        :return: one item per write, in the same order: the time in seconds the write took,
+          the exception raised while trying to do it, or ``None`` if it was cancelled
+          because an earlier write failed. A cancelled write may already have been sent.
+        """
+        return adapter.await_bleak(self._write_many_async(writes, ordered=ordered))
+
+    async def write_many_async(
+        self,
+        writes: Iterable[Tuple[Characteristic, Buf]],
+        *,
+        ordered: bool = True,
+    ) -> Tuple[Union[float, Exception, None], ...]:
+        """Coroutine version of `write_many`, usable from any event loop.
+        (Blinka _bleio only)"""
+        return await adapter.await_bleak_async(
+            self._write_many_async(writes, ordered=ordered)
+        )
+
+    async def _write_many_async(
+        self,
+        writes: Iterable[Tuple[Characteristic, Buf]],
+        *,
+        ordered: bool,
+    ) -> Tuple[Union[float, Exception, None], ...]:
+        writes = tuple(writes)
+
+        async def timed_write(
+            characteristic: Characteristic, data: Buf, response: bool
+        ):
+            start = time.monotonic()
+            # pylint: disable=protected-access
+            await characteristic._write_async(data, response=response)
+            return time.monotonic() - start
+
+        def needs_response(characteristic: Characteristic) -> bool:
+            return not characteristic.properties & Characteristic.WRITE_NO_RESPONSE
+
+        if not ordered:
+            return tuple(
+                await _gather_limited(
+                    (
+                        timed_write(
+                            characteristic, data, needs_response(characteristic)
+                        )
+                        for characteristic, data in writes
+                    ),
+                    None,
+                )
+            )
+
+        # Start all the writes now. Tasks first run in the order they are created, and each
+        # write is handed to the OS before its task first waits, so the writes go out
+        # back-to-back and in order, without waiting for each other to finish.
+        tasks = []
+        for i, (characteristic, data) in enumerate(writes):
+            if i == len(writes) - 1:
+                # Writes arrive in order, so an acknowledgment of the last one
+                # confirms all of them.
+                response = bool(
+                    characteristic.properties & Characteristic.WRITE
+                ) or needs_response(characteristic)
+            else:
+                response = needs_response(characteristic)
+            tasks.append(
+                asyncio.create_task(timed_write(characteristic, data, response))
+            )
+
+        results: List[Union[float, Exception, None]] = []
+        for task in tasks:
+            try:
+                results.append(await task)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                results.append(error)
+                break
+        # Cancel the writes after a failed one. Those already done are still reported.
+        remaining = tasks[len(results) :]
+        for task in remaining:
+            task.cancel()
+        await asyncio.gather(*remaining, return_exceptions=True)
+        for task in remaining:
+            if task.cancelled():
+                results.append(None)
+            elif task.exception() is not None:
+                results.append(task.exception())
+            else:
+                results.append(task.result())
+        return tuple(results)
+
+    def _notify_callback(self, sender: BleakGATTCharacteristic, data: Buf) -> None:
+        """Called by bleak, in the bleak thread, for notifications from any characteristic."""
+        characteristic = self._characteristics_by_handle.get(
+            getattr(sender, "handle", sender)
         )
+        if characteristic is not None:
+            characteristic._notify_callback(data)  # pylint: disable=protected-access
 
     @property
     def connected(self) -> bool:
@@ -799,7 +1362,7 @@ class Connection:
         which must be sent in a single packet.
         But for a regular characteristic read or write, may be sent in multiple packets,
         so this limit does not apply."""
-        raise NotImplementedError("max_packet_length not available")
+        return self.__bleak_client.mtu_size - self._ATT_HEADER_LENGTH
 
     def __repr__(self):
         return f"<Connection: {self._address}"
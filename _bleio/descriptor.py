@@ -130,18 +130,31 @@ class Descriptor:
     @property
     def value(self) -> bytes:
         """The value of this descriptor."""
-        return adapter.await_bleak(
-            # pylint: disable=protected-access
-            self.characteristic.service.connection._bleak_client.read_gatt_descriptor(
-                self.uuid.string
-            )
-        )
+        return adapter.await_bleak(self._read_async())
 
     @value.setter
     def value(self, val) -> None:
-        adapter.await_bleak(
-            # pylint: disable=protected-access
-            self.characteristic.service.connection._bleak_client.write_gatt_descriptor(
-                self.uuid.string, val
-            )
+        adapter.await_bleak(self._write_async(val))
+
+    async def read_async(self) -> bytes:
+        """Coroutine version of reading `value`, usable from any event loop.
+        (Blinka _bleio only)"""
+        return await adapter.await_bleak_async(self._read_async())
+
+    async def write_async(self, val: Buf) -> None:
+        """Coroutine version of setting `value`, usable from any event loop.
+        (Blinka _bleio only)"""
+        await adapter.await_bleak_async(self._write_async(val))
+
+    async def _read_async(self) -> bytes:
+        # pylint: disable=protected-access
+        client = self.characteristic.service.connection._bleak_client
+        # Look up by handle: descriptor UUIDs are not unique within a connection.
+        return await client.read_gatt_descriptor(self._bleak_gatt_descriptor.handle)
+
+    async def _write_async(self, val: Buf) -> None:
+        # pylint: disable=protected-access
+        client = self.characteristic.service.connection._bleak_client
+        await client.write_gatt_descriptor(
+            self._bleak_gatt_descriptor.handle, bytearray(val)
         )
@@ -0,0 +1,364 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`_bleio.hci`
+=======================================================================
+
+Parsing of HCI advertising reports, from hcidump output or a raw HCI socket,
+used by `_bleio.Adapter` when scanning on Linux.
+
+* Author(s): Dan Halbert for Adafruit Industries
+"""
+from __future__ import annotations
+from typing import BinaryIO, List, Union
+
+import binascii
+import re
+import socket
+import struct
+
+from _bleio.address import Address
+from _bleio.scan_buffer import _ScanBuffer
+from _bleio.scan_entry import ScanEntry, _PrefixMatcher
+
+Buf = Union[bytes, bytearray, memoryview]
+
+# pylint: disable=too-many-arguments
+
+# Read hcidump output in chunks of up to this many bytes.
+_HCIDUMP_READ_SIZE = 65536
+
+# An HCI LE Meta event in hcidump --raw output. ">" is controller to host,
+# 04 is for an HCI Event packet, and 3E is an LE meta-event. The hex bytes
+# continue on indented lines, up to the start of the next packet.
+_HCIDUMP_LE_META_EVENT_RE = re.compile(rb"^> (04 3E[0-9A-Fa-f \r\n]*)", re.MULTILINE)
+
+# Largest HCI event packet: packet type, event code, parameter length, parameters.
+_HCI_MAX_EVENT_SIZE = 3 + 255
+
+# How long to wait for the reply to an HCI command, in seconds, as hcitool does.
+_HCI_COMMAND_TIMEOUT = 1.0
+
+# LE Advertising Report, up to the data:
+# event type, address type, address, data length.
+# The data is followed by a signed RSSI byte.
+_LE_ADVERTISING_REPORT = struct.Struct("<BB6sB")
+
+# LE Extended Advertising Report, up to the data:
+# event type, address type, address, primary PHY, secondary PHY, advertising SID,
+# TX power, RSSI, periodic advertising interval, direct address type, direct address,
+# data length.
+_LE_EXTENDED_ADVERTISING_REPORT = struct.Struct("<HB6sBBBbbHB6sB")
+
+
+def _parse_hcidump_block(
+    block: bytes, matcher: _PrefixMatcher, minimum_rssi: int, active: bool
+) -> List[ScanEntry]:
+    """Parse a block of complete packets from hcidump --raw output,
+    and return the scan entries from all the advertising reports in it.
+    """
+    scan_entries = []
+    for match in _HCIDUMP_LE_META_EVENT_RE.finditer(block):
+        event = binascii.unhexlify(match.group(1).translate(None, b" \r\n"))
+        scan_entries.extend(_parse_hci_event(event, matcher, minimum_rssi, active))
+    return scan_entries
+
+
+def _parse_hci_event(
+    event: Buf, matcher: _PrefixMatcher, minimum_rssi: int, active: bool
+) -> List[ScanEntry]:
+    """Parse an HCI event packet, starting with its packet type byte, and return
+    a scan entry for each advertising report in it that passes the filters.
+    Events other than LE Advertising Reports and LE Extended Advertising Reports
+    are ignored.
+    """
+    # pylint: disable=too-many-locals
+    scan_entries: List[ScanEntry] = []
+    # 04 is for an HCI Event packet, and 3E is an LE meta-event.
+    if len(event) < 5 or event[0] != 0x04 or event[1] != 0x3E:
+        return scan_entries
+    subevent_code = event[3]
+    num_reports = event[4]
+    offset = 5
+    try:
+        if subevent_code == 0x02:
+            for _ in range(num_reports):
+                (
+                    event_type,
+                    address_type,
+                    address,
+                    data_length,
+                ) = _LE_ADVERTISING_REPORT.unpack_from(event, offset)
+                offset += _LE_ADVERTISING_REPORT.size
+                data = event[offset : offset + data_length]
+                offset += data_length
+                rssi = struct.unpack_from("b", event, offset)[0]
+                offset += 1
+                # Filter out scan responses if we weren't supposed to active scan.
+                if event_type == 0x04 and not active:
+                    continue
+                _add_scan_entry(
+                    scan_entries,
+                    matcher,
+                    minimum_rssi,
+                    address=address,
+                    address_type=address_type,
+                    rssi=rssi,
+                    data=data,
+                    connectable=event_type < 0x02,
+                    scan_response=event_type == 0x04,
+                )
+        elif subevent_code == 0x0D:
+            for _ in range(num_reports):
+                (
+                    event_type,
+                    address_type,
+                    address,
+                    _primary_phy,
+                    _secondary_phy,
+                    _sid,
+                    _tx_power,
+                    rssi,
+                    _periodic_interval,
+                    _direct_address_type,
+                    _direct_address,
+                    data_length,
+                ) = _LE_EXTENDED_ADVERTISING_REPORT.unpack_from(event, offset)
+                offset += _LE_EXTENDED_ADVERTISING_REPORT.size
+                data = event[offset : offset + data_length]
+                offset += data_length
+                # Bit 3 of the event type marks a scan response.
+                scan_response = bool(event_type & 0x08)
+                # Address type 0xFF is an anonymous advertisement, with no address.
+                if (scan_response and not active) or address_type == 0xFF:
+                    continue
+                _add_scan_entry(
+                    scan_entries,
+                    matcher,
+                    minimum_rssi,
+                    address=address,
+                    address_type=address_type,
+                    rssi=rssi,
+                    data=data,
+                    # Bit 0 of the event type marks a connectable advertisement.
+                    connectable=bool(event_type & 0x01),
+                    scan_response=scan_response,
+                )
+    except struct.error:
+        # Truncated event. Keep the reports parsed so far.
+        pass
+    return scan_entries
+
+
+def _add_scan_entry(
+    scan_entries: List[ScanEntry],
+    matcher: _PrefixMatcher,
+    minimum_rssi: int,
+    *,
+    address: bytes,
+    address_type: int,
+    rssi: int,
+    data: Buf,
+    connectable: bool,
+    scan_response: bool,
+) -> None:
+    """Append a ScanEntry for an advertising report to scan_entries,
+    if it passes the RSSI and prefix filters.
+    """
+    # 127 means RSSI is not available.
+    if rssi == 127 or rssi < minimum_rssi:
+        return
+    scan_entry = ScanEntry(
+        # Mod the address type by two because 2 and 3 are resolved versions of public and
+        # random static.
+        address=Address(address, address_type % 2),
+        rssi=rssi,
+        advertisement_bytes=bytes(data),
+        connectable=connectable,
+        scan_response=scan_response,
+    )
+    if matcher.matches(scan_entry):
+        scan_entries.append(scan_entry)
+
+
+def _read_hcidump(
+    hcidump_output: BinaryIO,
+    scan_buffer: _ScanBuffer,
+    matcher: _PrefixMatcher,
+    minimum_rssi: int,
+    active: bool,
+) -> None:
+    """Parse hcidump output into scan_buffer until hcidump exits.
+    Runs in its own thread.
+    """
+    try:
+        # Throw away the first two output lines of hcidump because they are version info.
+        hcidump_output.readline()
+        hcidump_output.readline()
+        pending = b""
+        while not scan_buffer.closed:
+            # Read whatever output is available, rather than a line at a time.
+            chunk = hcidump_output.read1(  # type: ignore[attr-defined]
+                _HCIDUMP_READ_SIZE
+            )
+            if chunk:
+                pending += chunk
+                # A packet is known to be complete only once the next packet has started.
+                end = max(pending.rfind(b"\n>"), pending.rfind(b"\n<")) + 1
+            else:
+                # hcidump has exited, so the last packet is complete too.
+                end = len(pending)
+            if end > 0:
+                for scan_entry in _parse_hcidump_block(
+                    pending[:end], matcher, minimum_rssi, active
+                ):
+                    scan_buffer.put(scan_entry)
+                pending = pending[end:]
+            if not chunk:
+                break
+    finally:
+        scan_buffer.close()
+
+
+def _start_hci_socket_scan(
+    hci_socket: socket.socket,
+    device_id: int,
+    *,
+    interval: float,
+    window: float,
+    active: bool,
+) -> None:
+    """Bind a raw HCI socket to the given controller, and start LE scanning on it.
+    Raise EnvironmentError if the controller rejects a command.
+    """
+    hci_socket.bind((device_id,))
+    # Receive command replies while setting up, and then only LE meta-events.
+    _set_hci_event_filter(hci_socket, 1 << 0x0E | 1 << 0x0F, 1 << (0x3E - 32))
+    hci_socket.settimeout(_HCI_COMMAND_TIMEOUT)
+    # Scan intervals are in units of 0.625 msecs.
+    interval_units = min(max(round(interval / 0.000625), 0x0004), 0x4000)
+    window_units = min(max(round(window / 0.000625), 0x0004), interval_units)
+    # LE Set Scan Enable: disable, so the parameters can be changed.
+    # Fails with Command Disallowed if the controller was not scanning, which is fine.
+    _send_hci_command(hci_socket, 0x200C, b"\x00\x00")
+    _receive_hci_command_status(hci_socket, 0x200C)
+    # LE Set Scan Parameters: type, interval, window,
+    # own address type (public), filter policy (accept all).
+    _run_hci_command(
+        hci_socket,
+        0x200B,
+        struct.pack("<BHHBB", int(active), interval_units, window_units, 0, 0),
+    )
+    # LE Set Scan Enable: enable, without filtering duplicates.
+    _run_hci_command(hci_socket, 0x200C, b"\x01\x00")
+    _set_hci_event_filter(hci_socket, 0, 1 << (0x3E - 32))
+
+
+def _set_hci_event_filter(
+    hci_socket: socket.socket, low_events: int, high_events: int
+) -> None:
+    """Only receive HCI event packets whose event codes are set in the two bit masks,
+    for events 0x00-0x1F and 0x20-0x3F.
+    """
+    hci_socket.setsockopt(
+        socket.SOL_HCI,  # pylint: disable=no-member
+        socket.HCI_FILTER,  # pylint: disable=no-member
+        struct.pack(
+            "=IIIH2x",
+            1 << 0x04,  # HCI Event packets
+            low_events,
+            high_events,
+            0,  # Any opcode
+        ),
+    )
+
+
+def _run_hci_socket_scan(
+    hci_socket: socket.socket,
+    scan_buffer: _ScanBuffer,
+    matcher: _PrefixMatcher,
+    minimum_rssi: int,
+    active: bool,
+    poll_interval: float,
+) -> None:
+    """Read scan results from hci_socket until the scan is stopped, and then
+    stop scanning and close the socket. Runs in its own thread.
+    """
+    with hci_socket:
+        try:
+            _read_hci_socket(
+                hci_socket, scan_buffer, matcher, minimum_rssi, active, poll_interval
+            )
+        finally:
+            # LE Set Scan Enable: disable.
+            _send_hci_command(hci_socket, 0x200C, b"\x00\x00")
+
+
+def _send_hci_command(hci_socket: socket.socket, opcode: int, params: bytes) -> None:
+    # 01 is for an HCI Command packet.
+    hci_socket.send(struct.pack("<BHB", 0x01, opcode, len(params)) + params)
+
+
+def _run_hci_command(hci_socket: socket.socket, opcode: int, params: bytes) -> None:
+    """Send an HCI command and wait for its reply, as hcitool does.
+    Raise EnvironmentError if the controller reports that it failed.
+    """
+    _send_hci_command(hci_socket, opcode, params)
+    status = _receive_hci_command_status(hci_socket, opcode)
+    if status != 0:
+        raise EnvironmentError(
+            "HCI command 0x{:04X} failed with status 0x{:02X}".format(opcode, status)
+        )
+
+
+def _receive_hci_command_status(hci_socket: socket.socket, opcode: int) -> int:
+    """Wait for the Command Complete or Command Status event for opcode,
+    and return its status. Other events are ignored.
+    """
+    while True:
+        event = hci_socket.recv(_HCI_MAX_EVENT_SIZE)
+        if len(event) == 0:
+            raise EnvironmentError("HCI socket closed")
+        if len(event) < 7 or event[0] != 0x04:
+            continue
+        # Command Complete: number of packets, opcode, status, return parameters.
+        if event[1] == 0x0E and struct.unpack_from("<H", event, 4)[0] == opcode:
+            return event[6]
+        # Command Status: status, number of packets, opcode.
+        if event[1] == 0x0F and struct.unpack_from("<H", event, 5)[0] == opcode:
+            return event[3]
+
+
+def _read_hci_socket(
+    hci_socket: socket.socket,
+    scan_buffer: _ScanBuffer,
+    matcher: _PrefixMatcher,
+    minimum_rssi: int,
+    active: bool,
+    poll_interval: float,
+) -> None:
+    """Put scan entries from the HCI event packets received on hci_socket into
+    scan_buffer, until scan_buffer is closed or the other end of the socket is closed.
+    hci_socket must deliver one whole packet per receive. Check whether scan_buffer
+    has been closed at least every ``poll_interval`` seconds.
+    """
+    buffer = bytearray(_HCI_MAX_EVENT_SIZE)
+    buffer_view = memoryview(buffer)
+    # Wake up periodically to check whether the scan has been stopped.
+    hci_socket.settimeout(poll_interval)
+    try:
+        while not scan_buffer.closed:
+            try:
+                length = hci_socket.recv_into(buffer)
+            except socket.timeout:
+                continue
+            if length == 0:
+                # Socket was closed.
+                break
+            for scan_entry in _parse_hci_event(
+                buffer_view[:length], matcher, minimum_rssi, active
+            ):
+                scan_buffer.put(scan_entry)
+    finally:
+        scan_buffer.close()
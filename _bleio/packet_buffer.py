@@ -9,15 +9,22 @@ _bleio implementation for Adafruit_Blinka_bleio
 
 * Author(s): Dan Halbert for Adafruit Industries
 """
+import collections
 import queue
-from typing import Union
+import threading
+import time
+from typing import Optional, Tuple, Union
 
-from _bleio.common import Characteristic
+from _bleio.common import adapter, Characteristic
+from _bleio.exceptions import BluetoothError
 
 Buf = Union[bytes, bytearray, memoryview]
 
+# Largest possible ATT attribute value.
+_MAX_PACKET_LENGTH = 512
 
-class PacketBuffer:
+
+class PacketBuffer:  # pylint: disable=too-many-instance-attributes
     """Accumulates a Characteristic's incoming packets in a FIFO buffer and facilitates packet aware
     outgoing writes. A packet's size is either the characteristic length or the maximum transmission
     unit (MTU) minus overhead, whichever is smaller. The MTU can change so check
@@ -26,7 +33,13 @@ class PacketBuffer:
     When we're the server, we ignore all connections besides the first to subscribe to
     notifications."""
 
-    def __init__(self, characteristic: Characteristic, *, buffer_size: int):
+    def __init__(
+        self,
+        characteristic: Characteristic,
+        *,
+        buffer_size: int,
+        preallocate: bool = False,
+    ):
         """Monitor the given Characteristic. Each time a new value is written to the Characteristic
         add the newly-written bytes to a FIFO buffer.
 
@@ -34,16 +47,102 @@ class PacketBuffer:
           It may be a local Characteristic provided by a Peripheral Service,
           or a remote Characteristic in a remote Service that a Central has connected to.
         :param int buffer_size: Size of ring buffer (in packets of the Characteristic's maximum
-          length) that stores incoming packets coming from the peer."""
-        self._queue = queue.Queue(buffer_size)
+          length) that stores incoming packets coming from the peer.
+        :param bool preallocate: If True, copy incoming packets into fixed-size slots in a
+          single preallocated buffer, instead of queuing each packet as a separate object.
+          This avoids per-packet allocation. buffer_size must then be at least 1.
+          (Blinka _bleio only)"""
+        if preallocate and buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1 when preallocating")
         self._characteristic = characteristic
+        self._buffer_size = buffer_size
+        self._queue: Optional[queue.Queue] = None
+        self._slab: Optional[bytearray] = None
+        if preallocate:
+            # buffer_size + 1 slots, each large enough for one packet. _slots is a ring of
+            # buffer_size of them: _count packets are unread, starting at _slots[_read_slot].
+            # The other one, _spare_slot, holds the packet last returned by
+            # read_packet_view(), so it is not overwritten while the caller uses it.
+            self._slot_size = self.incoming_packet_length
+            self._slab = bytearray((buffer_size + 1) * self._slot_size)
+            self._slab_view = memoryview(self._slab)
+            # Indexed by slot.
+            self._packet_lengths = [0] * (buffer_size + 1)
+            self._slots = list(range(buffer_size))
+            self._spare_slot = buffer_size
+            self._read_slot = 0
+            self._count = 0
+            # Notifications arrive in the bleak thread.
+            self._lock = threading.Lock()
+        else:
+            self._queue = queue.Queue(buffer_size)
+
+        # Packets passed to write() that have not been sent yet. They are sent by
+        # _write_outgoing(), running in the bleak thread, while _writing is True.
+        self._outgoing: collections.deque = collections.deque()
+        self._writing = False
+        self._writes_done = threading.Condition()
+        self._write_error: Optional[Exception] = None
+        self._last_write_burst: Optional[Tuple[int, int, float]] = None
+
         characteristic._add_notify_callback(self._notify_callback)
 
     def _notify_callback(self, data: Buf) -> None:
-        if self._queue.full():
-            # Discard oldest data to make room.
-            self._queue.get_nowait()
-        self._queue.put_nowait(data)
+        if self._slab is None:
+            if self._queue.full():
+                # Discard oldest data to make room.
+                self._queue.get_nowait()
+            self._queue.put_nowait(data)
+            return
+
+        data_len = len(data)
+        with self._lock:
+            if data_len > self._slot_size:
+                # The MTU has grown since the slots were allocated.
+                self._resize_slots(data_len)
+            if self._count == self._buffer_size:
+                # Discard oldest packet to make room.
+                self._read_slot = (self._read_slot + 1) % self._buffer_size
+                self._count -= 1
+            slot = self._slots[(self._read_slot + self._count) % self._buffer_size]
+            start = slot * self._slot_size
+            self._slab_view[start : start + data_len] = data
+            self._packet_lengths[slot] = data_len
+            self._count += 1
+
+    def _resize_slots(self, slot_size: int) -> None:
+        """Reallocate the preallocated slots to hold packets of up to ``slot_size`` bytes,
+        keeping any unread packets. Caller must hold ``self._lock``.
+        """
+        slab = bytearray(len(self._packet_lengths) * slot_size)
+        slab_view = memoryview(slab)
+        for slot, packet_len in enumerate(self._packet_lengths):
+            old_start = slot * self._slot_size
+            new_start = slot * slot_size
+            slab_view[new_start : new_start + packet_len] = self._slab_view[
+                old_start : old_start + packet_len
+            ]
+        # Views previously returned by read_packet_view() still refer to the old slab.
+        self._slot_size = slot_size
+        self._slab = slab
+        self._slab_view = slab_view
+
+    def _next_packet_view(self, *, keep: bool = False) -> Optional[memoryview]:
+        """Remove the oldest packet from the preallocated slots and return a view of it,
+        or return None if there are no packets. If ``keep`` is True, swap the packet's slot
+        out of the ring, so the packet is kept until the next call with ``keep``.
+        Caller must hold ``self._lock``.
+        """
+        if self._count == 0:
+            return None
+        slot = self._slots[self._read_slot]
+        if keep:
+            self._slots[self._read_slot] = self._spare_slot
+            self._spare_slot = slot
+        start = slot * self._slot_size
+        self._read_slot = (self._read_slot + 1) % self._buffer_size
+        self._count -= 1
+        return self._slab_view[start : start + self._packet_lengths[slot]]
 
     def readinto(self, buf: Buf) -> int:
         """Reads a single BLE packet into the ``buf``.
@@ -53,9 +152,21 @@ class PacketBuffer:
         :return: number of bytes read and stored into ``buf``
         :rtype: int
         """
-        if self._queue.empty():
-            return 0
-        packet = self._queue.get_nowait()
+        if self._slab is None:
+            if self._queue.empty():
+                return 0
+            packet = self._queue.get_nowait()
+            return self._copy_packet(packet, buf)
+
+        with self._lock:
+            packet = self._next_packet_view()
+            if packet is None:
+                return 0
+            # Copy while still locked, so the slot cannot be overwritten meanwhile.
+            return self._copy_packet(packet, buf)
+
+    @staticmethod
+    def _copy_packet(packet: Buf, buf: Buf) -> int:
         packet_len = len(packet)
         buf_len = len(buf)
 
@@ -65,6 +176,24 @@ class PacketBuffer:
         buf[0:packet_len] = packet
         return packet_len
 
+    def read_packet_view(self) -> Optional[memoryview]:
+        """Remove the next BLE packet from the buffer and return a read-only memoryview of it,
+        or None if no packet is available. (Blinka _bleio only)
+
+        If the buffer was created with ``preallocate=True``, no copy is made. The view refers
+        to the packet's slot in the buffer. That slot is set aside, so incoming packets do
+        not change it, but it is reused after the next call to `read_packet_view`.
+        Copy the data if it must be kept longer.
+        """
+        if self._slab is None:
+            if self._queue.empty():
+                return None
+            return memoryview(self._queue.get_nowait()).toreadonly()
+
+        with self._lock:
+            packet = self._next_packet_view(keep=True)
+        return None if packet is None else packet.toreadonly()
+
     def write(self, data: Buf, *, header: Union[Buf, None] = None) -> int:
         """Writes all bytes from data into the same outgoing packet.
         The bytes from header are included before data when the pending packet is currently empty.
@@ -74,16 +203,83 @@ class PacketBuffer:
         :return: number of bytes written. May include header bytes when packet is empty.
         :rtype: int
         """
-        # Unlike in native _bleio, we cannot merge outgoing packets while waiting
-        # for a pending packet to be sent. So just sent the packets with a full header,
-        # one at a time.
-        packet = header + data if header else data
-        self._characteristic.value = packet
+        self._raise_write_error()
+        # Unlike in native _bleio, we do not merge outgoing packets while waiting
+        # for a pending packet to be sent. Each write is sent as its own packet,
+        # with a full header. Copy it, because the caller may reuse data.
+        packet = bytearray(header + data if header else data)
+        with self._writes_done:
+            self._outgoing.append(packet)
+            if not self._writing:
+                self._writing = True
+                # pylint: disable=protected-access
+                adapter._submit_bleak(self._write_outgoing())
         return len(packet)
 
+    async def _write_outgoing(self) -> None:
+        """Send queued packets back-to-back until there are none left. Runs in the bleak thread."""
+        # Don't wait for a response unless the characteristic requires it.
+        response = (
+            not self._characteristic.properties & Characteristic.WRITE_NO_RESPONSE
+        )
+        start = time.monotonic()
+        packets_sent = 0
+        bytes_sent = 0
+        error = None
+        while True:
+            with self._writes_done:
+                if error or not self._outgoing:
+                    if error:
+                        self._write_error = error
+                        self._outgoing.clear()
+                    self._last_write_burst = (
+                        packets_sent,
+                        bytes_sent,
+                        time.monotonic() - start,
+                    )
+                    self._writing = False
+                    self._writes_done.notify_all()
+                    return
+                packet = self._outgoing.popleft()
+            try:
+                # pylint: disable=protected-access
+                await self._characteristic._write_async(packet, response=response)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # Report it to the writing thread at the next write() or flush().
+                error = exc
+                continue
+            packets_sent += 1
+            bytes_sent += len(packet)
+
+    def _raise_write_error(self) -> None:
+        with self._writes_done:
+            error = self._write_error
+            self._write_error = None
+        if error:
+            raise BluetoothError(f"Write failed: {error}") from error
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until all packets passed to `write` have been sent. (Blinka _bleio only)
+
+        :param float timeout: the maximum time to wait, in seconds. If None, wait indefinitely.
+        """
+        with self._writes_done:
+            if not self._writes_done.wait_for(lambda: not self._writing, timeout):
+                raise BluetoothError("Timed out waiting for writes to be sent")
+        self._raise_write_error()
+
+    @property
+    def last_write_burst(self) -> Optional[Tuple[int, int, float]]:
+        """Statistics for the most recently completed burst of back-to-back writes,
+        as a tuple of (packets sent, bytes sent, seconds taken), or None if there has not
+        been one yet. ``bytes / seconds`` is the burst's throughput. (Blinka _bleio only)
+        """
+        return self._last_write_burst
+
     def deinit(self) -> None:
         """Disable permanently."""
-        self._characteristic.remove_notify_callback(self._notify_callback)
+        # pylint: disable=protected-access
+        self._characteristic._remove_notify_callback(self._notify_callback)
 
     @property
     def packet_size(self) -> int:
@@ -95,9 +291,18 @@ class PacketBuffer:
     @property
     def incoming_packet_length(self) -> int:
         """Maximum length in bytes of a packet we are reading."""
-        return 512
+        return self._packet_length()
 
     @property
     def outgoing_packet_length(self):
         """Maximum length in bytes of a packet we are writing."""
-        return 512
+        return self._packet_length()
+
+    def _packet_length(self) -> int:
+        """A packet must fit in the connection's negotiated ATT MTU."""
+        # pylint: disable=protected-access
+        service = self._characteristic._service
+        connection = service.connection if service else None
+        if connection is None:
+            return _MAX_PACKET_LENGTH
+        return min(connection.max_packet_length, _MAX_PACKET_LENGTH)
@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`_bleio.scan_buffer`
+=======================================================================
+
+Buffers of scan results and scanned devices, used by `_bleio.Adapter`.
+
+* Author(s): Dan Halbert for Adafruit Industries
+"""
+from __future__ import annotations
+from typing import Any, Optional
+
+import collections
+import threading
+import time
+
+from bleak.backends.device import BLEDevice  # type: ignore[import]
+
+from _bleio.scan_entry import ScanEntry
+
+
+class _ScanBuffer:  # pylint: disable=protected-access
+    """A bounded FIFO of scan entries, filled by a scanning thread or callback
+    and drained by `Adapter.start_scan`. When it is full, ``overflow_policy`` says what
+    to do with a new entry:
+
+    * ``"drop_oldest"``: discard the oldest waiting entry.
+    * ``"drop_newest"``: discard the new entry.
+    * ``"coalesce"``: replace the newest waiting entry from the same address,
+      or if there is none, discard the oldest waiting entry.
+    """
+
+    OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "coalesce")
+
+    def __init__(self, size: int, overflow_policy: str):
+        self._size = size
+        self._overflow_policy = overflow_policy
+        # Each entry is in a one-item list, so that it can be replaced in place
+        # when coalescing.
+        self._entries: collections.deque = collections.deque()
+        # The newest waiting entry for each address key.
+        self._newest: dict = {}
+        self._condition = threading.Condition()
+        self.dropped = 0
+        """Number of entries discarded because the buffer was full."""
+        self.closed = False
+        """True when no more entries will be added."""
+
+    def put(self, scan_entry: ScanEntry) -> None:
+        with self._condition:
+            if len(self._entries) >= self._size:
+                self.dropped += 1
+                if self._overflow_policy == "drop_newest":
+                    return
+                if self._overflow_policy == "coalesce":
+                    slot = self._newest.get(scan_entry.address._key)
+                    if slot:
+                        slot[0] = scan_entry
+                        return
+                self._remove_oldest()
+            slot = [scan_entry]
+            self._entries.append(slot)
+            self._newest[scan_entry.address._key] = slot
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float]) -> Optional[ScanEntry]:
+        """Remove and return the oldest entry, waiting up to timeout seconds for one
+        if necessary. Return None if there is none.
+        """
+        with self._condition:
+            if not self._entries and not self.closed:
+                self._condition.wait(timeout)
+            if not self._entries:
+                return None
+            return self._remove_oldest()
+
+    def _remove_oldest(self) -> ScanEntry:
+        """Caller must hold ``self._condition``."""
+        slot = self._entries.popleft()
+        key = slot[0].address._key
+        if self._newest.get(key) is slot:
+            del self._newest[key]
+        return slot[0]
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class _DeviceCache:
+    """Recently scanned bleak devices, by address. Holds at most ``max_size`` devices,
+    evicting the least recently used first, and forgets devices that have not been
+    seen for ``ttl`` seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._max_size = max_size
+        self._ttl = ttl
+        # {address: (time last seen, device)}, least recently used first.
+        self._devices: collections.OrderedDict = collections.OrderedDict()
+        # Devices are added in the bleak thread, but may be looked up elsewhere.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, address: Any) -> Optional[BLEDevice]:
+        with self._lock:
+            entry = self._devices.get(address)
+            if entry is not None and time.monotonic() - entry[0] > self._ttl:
+                # Too old.
+                del self._devices[address]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._devices.move_to_end(address)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, address: Any, device: BLEDevice) -> None:
+        with self._lock:
+            self._devices[address] = (time.monotonic(), device)
+            self._devices.move_to_end(address)
+            while len(self._devices) > self._max_size:
+                self._devices.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._devices.clear()
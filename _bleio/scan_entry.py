@@ -10,6 +10,7 @@ _bleio implementation for Adafruit_Blinka_bleio
 * Author(s): Dan Halbert for Adafruit Industries
 """
 from __future__ import annotations
+import functools
 import re
 from typing import Dict, List, Optional, Union
 
@@ -23,6 +24,99 @@ Buf = Union[bytes, bytearray, memoryview]
 DataDict = Dict[int, Buf]
 
 
+class _MergedReports:  # pylint: disable=too-few-public-methods
+    """What a ScanEntry keeps about the other reports merged into it by coalescing.
+    Only merged entries have one.
+    """
+
+    __slots__ = ("rssi_min", "rssi_max", "rssi_total", "report_count", "scan_response")
+
+    def __init__(self, rssi: int):
+        self.rssi_min = rssi
+        self.rssi_max = rssi
+        self.rssi_total = rssi
+        self.report_count = 1
+        # Scan response data merged into an advertisement.
+        self.scan_response: Optional[bytes] = None
+
+    def add_rssi(self, rssi: int) -> None:
+        self.rssi_min = min(self.rssi_min, rssi)
+        self.rssi_max = max(self.rssi_max, rssi)
+        self.rssi_total += rssi
+        self.report_count += 1
+
+
+class _PrefixMatcher:  # pylint: disable=too-few-public-methods
+    """Advertising data prefixes, compiled once to be matched against many ScanEntry objects.
+    Each prefix is an advertising data type byte followed by the start of the data. The
+    prefixes are indexed by that type byte, so when matching any prefix, each field is only
+    compared with the prefixes that can match it. When matching all of them, matching stops
+    at the first prefix that matches no field.
+    """
+
+    __slots__ = (
+        "_match_all",
+        "_prefixes",
+        "_prefix_tuples_by_type",
+        "_any_field",
+    )
+
+    def __init__(self, prefixes: bytes, *, match_all: bool):
+        self._match_all = match_all
+        # Duplicate prefixes are only checked once.
+        unique_prefixes = dict.fromkeys(ScanEntry._separate_prefixes(prefixes))
+        # An empty prefix matches any field.
+        self._any_field = b"" in unique_prefixes
+        unique_prefixes.pop(b"", None)
+        self._prefixes = tuple(unique_prefixes)
+        # For matching any prefix: {data type: (prefix, ...)}, to pass to bytes.startswith().
+        prefixes_by_type: Dict[int, List[bytes]] = {}
+        for prefix in self._prefixes:
+            prefixes_by_type.setdefault(prefix[0], []).append(prefix)
+        self._prefix_tuples_by_type = {
+            data_type: tuple(type_prefixes)
+            for data_type, type_prefixes in prefixes_by_type.items()
+        }
+
+    def matches(self, scan_entry: "ScanEntry") -> bool:
+        """True if any of the prefixes matches a field of the advertisement, or if
+        ``match_all`` was given, if every prefix matches some field.
+        An empty set of prefixes matches everything.
+        """
+        if not self._prefixes and not self._any_field:
+            return True
+        # pylint: disable=protected-access
+        data = scan_entry.advertisement_bytes
+        offsets = ScanEntry._field_offsets(data)
+        if not self._match_all:
+            return self._matches_any(data, offsets)
+        if self._any_field and not offsets:
+            # A field must match an empty prefix too.
+            return False
+        field_count = len(offsets)
+        for prefix in self._prefixes:
+            for i in range(0, field_count, 2):
+                if data.startswith(prefix, offsets[i], offsets[i + 1]):
+                    break
+            else:
+                # Most advertisements fail on the first prefix, so stop here.
+                return False
+        return True
+
+    def _matches_any(self, data: bytes, offsets: List[int]) -> bool:
+        if self._any_field and offsets:
+            return True
+        prefix_tuples_by_type = self._prefix_tuples_by_type
+        for i in range(0, len(offsets), 2):
+            start = offsets[i]
+            end = offsets[i + 1]
+            if start != end:
+                prefixes = prefix_tuples_by_type.get(data[start])
+                if prefixes and data.startswith(prefixes, start, end):
+                    return True
+        return False
+
+
 class ScanEntry:
     # Some device names are created by the bleak code or what it calls, and aren't the
     # real advertised name. Suppress those. Patterns seen include (XX are hex digits):
@@ -36,6 +130,17 @@ class ScanEntry:
         re.IGNORECASE,
     )
 
+    # Many ScanEntry objects may be kept at once, so don't give each one a __dict__.
+    __slots__ = (
+        "_address",
+        "_rssi",
+        "_advertisement_bytes",
+        "_connectable",
+        "_scan_response",
+        "_data_dict",
+        "_merged",
+    )
+
     # pylint: disable=too-many-arguments
     def __init__(
         self,
@@ -54,6 +159,8 @@ class ScanEntry:
         self._connectable = connectable
         self._scan_response = scan_response
         self._data_dict = data_dict
+        # Made by _merge(), so entries that are never merged don't pay for it.
+        self._merged: Optional[_MergedReports] = None
         if advertisement_bytes and data_dict:
             raise ValueError(
                 "advertisement_bytes and data_dict must not both be supplied"
@@ -72,6 +179,30 @@ class ScanEntry:
             data_dict=cls._data_dict_from_bleak(device, advertisement_data),
         )
 
+    def _merge(self, other: "ScanEntry") -> None:
+        """Merge a later report from the same address into this one.
+        A scan response is appended to the advertisement data. Otherwise the later
+        report's data replaces this one's.
+        """
+        # pylint: disable=protected-access
+        # start_scan() only merges new reports, which have not been merged themselves.
+        if self._merged is None:
+            self._merged = _MergedReports(self._rssi)
+        merged = self._merged
+        merged.add_rssi(other._rssi)
+        self._rssi = other._rssi
+
+        if other._scan_response and not self._scan_response:
+            merged.scan_response = other.advertisement_bytes
+            return
+        if self._scan_response and not other._scan_response:
+            # Until now there have only been scan responses.
+            merged.scan_response = self.advertisement_bytes
+            self._scan_response = False
+        self._advertisement_bytes = other._advertisement_bytes
+        self._data_dict = other._data_dict
+        self._connectable = other._connectable
+
     def matches(
         self,
         prefixes: bytes,
@@ -81,21 +212,15 @@ class ScanEntry:
         # do a perfect job of matching.
         if len(prefixes) == 0:
             return True
-        fields = self._advertisement_fields
-        for prefix in self._separate_prefixes(prefixes):
-            prefix_matched = False
-            for field in fields:
-                if field.startswith(prefix):
-                    if not match_all:
-                        return True
-                    prefix_matched = True
-                    break
-            # if all, this prefix must match at least one field
-            if not prefix_matched and match_all:
-                return False
+        return self._compile_prefixes(bytes(prefixes), match_all).matches(self)
 
-        # All prefixes matched some field (if all), or none did (if any).
-        return match_all
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _compile_prefixes(prefixes: bytes, match_all: bool) -> _PrefixMatcher:
+        """Return a matcher for the given concatenated prefixes. Recently used
+        matchers are reused.
+        """
+        return _PrefixMatcher(prefixes, match_all=match_all)
 
     def __repr__(self) -> str:
         return str(self)
@@ -111,6 +236,23 @@ class ScanEntry:
     def rssi(self) -> int:
         return self._rssi
 
+    @property
+    def rssi_min(self) -> int:
+        """Lowest RSSI of the reports merged into this entry. (Blinka _bleio only)"""
+        return self._merged.rssi_min if self._merged else self._rssi
+
+    @property
+    def rssi_max(self) -> int:
+        """Highest RSSI of the reports merged into this entry. (Blinka _bleio only)"""
+        return self._merged.rssi_max if self._merged else self._rssi
+
+    @property
+    def rssi_mean(self) -> float:
+        """Mean RSSI of the reports merged into this entry. (Blinka _bleio only)"""
+        if self._merged:
+            return self._merged.rssi_total / self._merged.report_count
+        return self._rssi
+
     @property
     def connectable(self) -> bool:
         return self._connectable
@@ -124,30 +266,48 @@ class ScanEntry:
         """The original advertisement bytes may not be available. Concatenate the
         data_dict entries to make an incomplete advertising bytestring.
         """
-        if self._advertisement_bytes:
-            return self._advertisement_bytes
-        return b"".join(
-            bytes((len(field),)) + field for field in self._advertisement_fields
-        )
+        if self._advertisement_bytes is not None:
+            advertisement_bytes = bytes(self._advertisement_bytes)
+        else:
+            advertisement_bytes = b"".join(
+                bytes((len(field),)) + field for field in self._data_dict_fields
+            )
+        if self._merged and self._merged.scan_response:
+            advertisement_bytes += self._merged.scan_response
+        return advertisement_bytes
+
+    @staticmethod
+    def _field_offsets(advertisement_bytes: bytes) -> List[int]:
+        """Where each data field is in advertisement_bytes, without its length header,
+        as start and end offsets: ``[start0, end0, start1, end1, ...]``.
+        Not kept on the entry, since many entries may be kept at once.
+        """
+        data_length = len(advertisement_bytes)
+        offsets = []
+        idx = 0
+        while idx < data_length:
+            start = idx + 1
+            idx = min(start + advertisement_bytes[idx], data_length)
+            offsets.append(start)
+            offsets.append(idx)
+        return offsets
 
     @property
-    def _advertisement_fields(self) -> List[bytes]:
+    def _advertisement_fields(self) -> List[memoryview]:
         """The individual data fields of the advertisement, without length headers.
         Each field is one byte of advertising data type followed by the data.
+        The fields are views of `advertisement_bytes`, not copies.
         """
-        if self._advertisement_bytes is not None:
-            fields = []
-            idx = 0
-            while idx < len(self._advertisement_bytes):
-                field_length = self._advertisement_bytes[idx]
-                idx += 1
-                fields.append(self._advertisement_bytes[idx : idx + field_length])
-                idx += field_length
-            return fields
-
-        return tuple(
+        advertisement_bytes = self.advertisement_bytes
+        data = memoryview(advertisement_bytes)
+        offsets = self._field_offsets(advertisement_bytes)
+        return [data[offsets[i] : offsets[i + 1]] for i in range(0, len(offsets), 2)]
+
+    @property
+    def _data_dict_fields(self) -> List[bytes]:
+        return [
             bytes((data_type,)) + data for data_type, data in self._data_dict.items()
-        )
+        ]
 
     @staticmethod
     def _manufacturer_data_from_bleak(manufacturer_data: Dict[int, bytes]) -> bytes:
@@ -14,33 +14,21 @@ _bleio implementation for Adafruit_Blinka_bleio
 from __future__ import annotations
 from typing import Any, Union
 
-import re
+import functools
 
 Buf = Union[bytes, bytearray, memoryview]
 
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_Blinka_bleio.git"
 
-_UUID_RE = re.compile(
-    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", flags=re.IGNORECASE
-)
-
-_STANDARD_UUID_RE_16 = re.compile(
-    r"0000....-0000-1000-8000-00805f9b34fb", flags=re.IGNORECASE
-)
-
-_STANDARD_UUID_RE_32 = re.compile(
-    r"........-0000-1000-8000-00805f9b34fb", flags=re.IGNORECASE
-)
-
-_STANDARD_HEX_UUID_RE = re.compile(r"[0-9a-f]{1,8}", flags=re.IGNORECASE)
-
 _BASE_STANDARD_UUID = (
     b"\xFB\x34\x9B\x5F\x80\x00\x00\x80\x00\x10\x00\x00\x00\x00\x00\x00"
 )
 
 
 class UUID:
+    __slots__ = ("_uuid128", "_size", "_int", "_hash", "_string", "__bleak_uuid")
+
     @staticmethod
     def standard_uuid128_from_uuid32(uuid32: int) -> bytes:
         """Return a 128-bit standard UUID from a 32-bit standard UUID."""
@@ -49,33 +37,38 @@ class UUID:
         return _BASE_STANDARD_UUID[:-4] + uuid32.to_bytes(4, "little")
 
     @staticmethod
-    def _init_from_str(uuid: str) -> tuple[bytes, int]:
-        if _UUID_RE.fullmatch(uuid):
-            # Pick the smallest standard size.
-            if _STANDARD_UUID_RE_16.fullmatch(uuid):
-                size = 16
-                uuid16 = int(uuid[4:8], 16)
-                uuid128 = UUID.standard_uuid128_from_uuid32(uuid16)
-                return uuid128, size
+    def _fromhex(hex_digits: str, length: int) -> bytes:
+        """Convert exactly ``2 * length`` hex digits to ``length`` bytes,
+        or return ``b""`` if they aren't.
+        """
+        try:
+            # fromhex() skips spaces, so also check the length.
+            value = bytes.fromhex(hex_digits)
+        except ValueError:
+            return b""
+        return value if len(value) == length else b""
 
-            if _STANDARD_UUID_RE_32.fullmatch(uuid):
-                size = 32
-                uuid32 = int(uuid[0:8], 16)
-                uuid128 = UUID.standard_uuid128_from_uuid32(uuid32)
+    @staticmethod
+    def _init_from_str(uuid: str) -> tuple[bytes, int]:
+        if len(uuid) == 36 and uuid[8] == uuid[13] == uuid[18] == uuid[23] == "-":
+            uuid128 = UUID._fromhex(
+                uuid[0:8] + uuid[9:13] + uuid[14:18] + uuid[19:23] + uuid[24:36], 16
+            )[::-1]
+            if uuid128:
+                # Pick the smallest standard size.
+                if uuid128[:12] == _BASE_STANDARD_UUID[:12]:
+                    return uuid128, (16 if uuid128[14:] == b"\x00\x00" else 32)
+                return uuid128, 128
+
+        elif len(uuid) in (4, 8):
+            uuid_bytes = UUID._fromhex(uuid, len(uuid) // 2)
+            if uuid_bytes:
+                size = len(uuid) * 4  # 4 bits per hex digit
+                uuid128 = UUID.standard_uuid128_from_uuid32(
+                    int.from_bytes(uuid_bytes, "big")
+                )
                 return uuid128, size
 
-            size = 128
-            uuid = uuid.replace("-", "")
-            uuid128 = bytes(int(uuid[i : i + 2], 16) for i in range(30, -1, -2))
-            return uuid128, size
-
-        if _STANDARD_HEX_UUID_RE.fullmatch(uuid) and len(uuid) in (4, 8):
-            # Fall through and reprocess as an int.
-            uuid_int = int(uuid, 16)
-            size = len(uuid) * 4  # 4 bits per hex digit
-            uuid128 = UUID.standard_uuid128_from_uuid32(uuid_int)
-            return uuid128, size
-
         raise ValueError(
             "UUID string not 'xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx',"
             "'xxxx', or 'xxxxxxxx', but is " + uuid
@@ -104,8 +97,19 @@ class UUID:
         uuid128 = bytes(uuid)
         return uuid128, size
 
-    def __init__(self, uuid: Union[int, Buf, str]):
+    def __new__(cls, uuid: Union[int, Buf, str]) -> "UUID":
+        # A UUID is not changed once it's made, so the same str or int can share one.
+        if isinstance(uuid, (str, int)):
+            return cls._cached_new(uuid)
+        return cls._new(uuid)
+
+    @classmethod
+    def _new(cls, uuid: Union[int, Buf, str]) -> "UUID":
+        # This does the work of __init__.
+        # pylint: disable=attribute-defined-outside-init
+        self = super().__new__(cls)
         self.__bleak_uuid = None
+        self._string = None
 
         if isinstance(uuid, str):
             self._uuid128, self._size = self._init_from_str(uuid)
@@ -116,25 +120,48 @@ class UUID:
         else:
             self._uuid128, self._size = self._init_from_buf(uuid)
 
+        # The UUID value at its own size, for comparing and hashing.
+        if self._size == 16:
+            self._int = int.from_bytes(self._uuid128[12:14], "little")
+        elif self._size == 32:
+            self._int = int.from_bytes(self._uuid128[12:], "little")
+        else:
+            self._int = int.from_bytes(self._uuid128, "little")
+        self._hash = hash(self._int)
+        return self
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _cached_new(uuid: Union[int, str]) -> "UUID":
+        return UUID._new(uuid)
+
     @classmethod
     def _from_bleak(cls, bleak_uuid: Any) -> "UUID":
         """Convert a bleak UUID to a _bleio.UUID."""
-        uuid = UUID(bleak_uuid)
-        uuid.__bleak_uuid = bleak_uuid  # pylint: disable=unused-private-member
+        # Make a new UUID, because shared ones must not be changed.
+        uuid = cls._new(bleak_uuid)
+        # pylint: disable=unused-private-member,attribute-defined-outside-init
+        uuid.__bleak_uuid = bleak_uuid
         return uuid
 
+    def __reduce__(self):
+        # Rebuild at the same size, for copy and pickle.
+        if self._size == 16:
+            return (UUID, (f"{self._int:04x}",))
+        if self._size == 32:
+            return (UUID, (f"{self._int:08x}",))
+        return (UUID, (self._uuid128,))
+
     @property
     def _bleak_uuid(self):
         """Bleak UUID"""
-        if not self.__bleak_uuid:
-            self.__bleak_uuid = str(self)
-        return self.__bleak_uuid
+        return self.__bleak_uuid or str(self)
 
     @property
     def uuid16(self) -> int:
         if self.size > 16:
             raise ValueError(f"This is a {self.size}-bit UUID")
-        return int.from_bytes(self._uuid128[12:14], "little")
+        return self._int
 
     @property
     def uuid32(self) -> int:
@@ -175,31 +202,25 @@ class UUID:
         )
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
         if isinstance(other, UUID):
-            if self.size == 16 and other.size == 16:
-                return self.uuid16 == other.uuid16
-            if self.size == 32 and other.size == 32:
-                return self.uuid32 == other.uuid32
-            if self.size == 128 and other.size == 128:
-                return self.uuid128 == other.uuid128
+            # UUIDs of different sizes are never equal.
+            return self._size == other._size and self._int == other._int
 
         return False
 
     def __hash__(self):
-        if self.size == 16:
-            return hash(self.uuid16)
-        if self.size == 32:
-            return hash(self.uuid32)
-        return hash(self.uuid128)
+        return self._hash
 
     def __str__(self) -> str:
-        return (
-            "{:02x}{:02x}{:02x}{:02x}-"  # pylint: disable=consider-using-f-string
-            "{:02x}{:02x}-"
-            "{:02x}{:02x}-"
-            "{:02x}{:02x}-"
-            "{:02x}{:02x}{:02x}{:02x}{:02x}{:02x}"
-        ).format(*reversed(self.uuid128))
+        if self._string is None:
+            digits = self._uuid128[::-1].hex()
+            # pylint: disable-next=attribute-defined-outside-init
+            self._string = "-".join(
+                (digits[0:8], digits[8:12], digits[12:16], digits[16:20], digits[20:32])
+            )
+        return self._string
 
     def __repr__(self) -> str:
         if self.size == 16:
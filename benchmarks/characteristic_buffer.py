@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure CharacteristicBuffer readinto() and readline() throughput in bytes/s,
+compared with the per-byte queue.Queue it used to be built on.
+
+Notifications are delivered directly to the buffer, in the same thread, so only the
+buffer's own cost is measured. Run from the top of the repository::
+
+    python -m benchmarks.characteristic_buffer [--megabytes N] [--packet-size N]
+"""
+
+import argparse
+import queue
+import time
+
+from _bleio.characteristic_buffer import CharacteristicBuffer
+
+
+class FakeCharacteristic:  # pylint: disable=too-few-public-methods
+    def __init__(self):
+        self.notify = None
+
+    def _add_notify_callback(self, callback):
+        self.notify = callback
+
+    def _remove_notify_callback(self, _callback):
+        self.notify = None
+
+
+class QueueBuffer:
+    """The data path of the old CharacteristicBuffer: one queue.Queue item per byte.
+    It never has to wait for data here, so its timeouts are left out.
+    """
+
+    def __init__(self, characteristic, *, buffer_size):
+        self._queue = queue.Queue(buffer_size)
+        characteristic._add_notify_callback(self._notify_callback)
+
+    def _notify_callback(self, data):
+        if self._queue.full():
+            while self._queue.qsize() > len(data):
+                self._queue.get_nowait()
+        for data_byte in data:
+            try:
+                self._queue.put_nowait(data_byte)
+            except queue.Full:
+                return
+
+    def readinto(self, buf):
+        idx = 0
+        while idx < len(buf):
+            buf[idx] = self._queue.get_nowait()
+            idx += 1
+        return idx
+
+    def readline(self):
+        line = bytearray()
+        while True:
+            line_byte = self._queue.get_nowait()
+            line.append(line_byte)
+            if line_byte == 0x0A:
+                return line
+
+    @property
+    def in_waiting(self):
+        return self._queue.qsize()
+
+
+def measure(make_buffer, *, total_bytes, packet_size, buffer_size, lines):
+    """Return bytes/s for delivering total_bytes in packet_size notifications and
+    reading them back, a buffer full at a time.
+    """
+    characteristic = FakeCharacteristic()
+    buffer = make_buffer(characteristic, buffer_size=buffer_size)
+    # 63 characters and a newline per line.
+    line = b"x" * 63 + b"\n"
+    stream = line * (buffer_size // len(line))
+    packets = [stream[i : i + packet_size] for i in range(0, len(stream), packet_size)]
+    read_buffer = bytearray(len(stream))
+
+    received = 0
+    start = time.perf_counter()
+    while received < total_bytes:
+        for packet in packets:
+            characteristic.notify(packet)
+        if lines:
+            while buffer.in_waiting:
+                received += len(buffer.readline())
+        else:
+            received += buffer.readinto(read_buffer)
+    return received / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=2)
+    parser.add_argument("--packet-size", type=int, default=20)
+    parser.add_argument("--buffer-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    total_bytes = int(args.megabytes * 1_000_000)
+    print(
+        f"{total_bytes} bytes in {args.packet_size}-byte notifications, "
+        f"buffer_size={args.buffer_size}"
+    )
+    for name, make_buffer in (
+        ("queue.Queue per byte", QueueBuffer),
+        ("CharacteristicBuffer", CharacteristicBuffer),
+    ):
+        for method, lines in (("readinto", False), ("readline", True)):
+            rate = measure(
+                make_buffer,
+                total_bytes=total_bytes,
+                packet_size=args.packet_size,
+                buffer_size=args.buffer_size,
+                lines=lines,
+            )
+            print(f"{name:22} {method:9} {rate / 1_000_000:8.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure how long Adapter.connect_many() takes to bring up a number of simulated
+devices, as max_concurrency varies, compared with connecting one at a time.
+
+Run from the top of the repository::
+
+    python -m benchmarks.connect_many [--devices N] [--latency SECONDS]
+"""
+
+import argparse
+import time
+
+import _bleio
+
+from benchmarks import fakes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=40)
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="seconds per simulated connect"
+    )
+    args = parser.parse_args()
+
+    fakes.install(args.latency)
+    adapter = _bleio.adapter
+    addresses = [
+        _bleio.Address(string=f"AA:BB:CC:DD:{i // 256:02X}:{i % 256:02X}")
+        for i in range(args.devices)
+    ]
+
+    print(f"{args.devices} devices, {args.latency * 1000:.0f} ms per connect")
+    start = time.perf_counter()
+    for address in addresses:
+        adapter.connect(address, timeout=10)
+    elapsed = time.perf_counter() - start
+    print(f"connect() one at a time:        {elapsed:7.3f} s")
+    for connection in adapter.connections:
+        connection.disconnect()
+
+    max_concurrency = 1
+    while max_concurrency <= args.devices:
+        start = time.perf_counter()
+        results = adapter.connect_many(
+            addresses, timeout=10, max_concurrency=max_concurrency
+        )
+        elapsed = time.perf_counter() - start
+        failed = sum(isinstance(result, Exception) for result in results)
+        print(
+            f"connect_many(max_concurrency={max_concurrency:2}): {elapsed:7.3f} s"
+            + (f", {failed} failed" if failed else "")
+        )
+        for connection in adapter.connections:
+            connection.disconnect()
+        max_concurrency *= 2
+
+
+if __name__ == "__main__":
+    main()
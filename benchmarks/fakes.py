@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""A simulated BleakClient, so benchmarks can run without Bluetooth hardware.
+Each operation that would go over the air sleeps for ``FakeBleakClient.latency`` seconds.
+"""
+
+import asyncio
+import types
+
+from _bleio import common
+
+# Nordic UART Service and its characteristics, plus a few sensor-like characteristics.
+_SERVICES = (
+    (
+        "6e400001-b5a3-f393-e0a9-e50e24dcca9e",
+        (
+            (
+                "6e400002-b5a3-f393-e0a9-e50e24dcca9e",
+                ["write-without-response", "write"],
+            ),
+            ("6e400003-b5a3-f393-e0a9-e50e24dcca9e", ["notify"]),
+        ),
+    ),
+    (
+        "0000181a-0000-1000-8000-00805f9b34fb",
+        tuple(
+            (f"0000{uuid16:04x}-0000-1000-8000-00805f9b34fb", ["read", "notify"])
+            for uuid16 in range(0x2A6C, 0x2A78)
+        ),
+    ),
+)
+
+
+class _FakeServices(list):
+    def get_characteristic(self, handle):
+        for service in self:
+            for characteristic in service.characteristics:
+                if characteristic.handle == handle:
+                    return characteristic
+        return None
+
+
+def _make_services():
+    services = _FakeServices()
+    handle = 1
+    for service_uuid, characteristics in _SERVICES:
+        service = types.SimpleNamespace(
+            uuid=service_uuid, handle=handle, characteristics=[]
+        )
+        handle += 1
+        for uuid, properties in characteristics:
+            service.characteristics.append(
+                types.SimpleNamespace(
+                    uuid=uuid, handle=handle, properties=properties, descriptors=[]
+                )
+            )
+            handle += 2
+        services.append(service)
+    return services
+
+
+class FakeBleakClient:
+    """Stands in for bleak.BleakClient."""
+
+    latency = 0.0
+
+    def __init__(self, address_or_ble_device, **_kwargs):
+        self.address = getattr(address_or_ble_device, "address", address_or_ble_device)
+        self.is_connected = False
+        self.mtu_size = 247
+        self.services = None
+        self._notify_callbacks = {}
+
+    async def connect(self, **_kwargs):
+        await asyncio.sleep(self.latency)
+        self.services = _make_services()
+        self.is_connected = True
+
+    async def disconnect(self):
+        self.services = None
+        self.is_connected = False
+
+    async def read_gatt_char(self, characteristic):
+        await asyncio.sleep(self.latency)
+        return bytearray(characteristic.handle.to_bytes(2, "little"))
+
+    async def write_gatt_char(self, _characteristic, _data, response=False):
+        if response:
+            await asyncio.sleep(self.latency)
+
+    async def start_notify(self, characteristic, callback, **_kwargs):
+        self._notify_callbacks[characteristic.handle] = (characteristic, callback)
+
+    async def stop_notify(self, characteristic):
+        self._notify_callbacks.pop(characteristic.handle, None)
+
+    def notify(self, handle, data):
+        """Deliver a notification, as bleak would in its thread."""
+        characteristic, callback = self._notify_callbacks[handle]
+        callback(characteristic, bytearray(data))
+
+
+def install(latency: float) -> None:
+    """Make _bleio use FakeBleakClient, with the given latency in seconds."""
+    FakeBleakClient.latency = latency
+    common.BleakClient = FakeBleakClient
@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure how many advertising reports per second the hcitool backend can parse,
+by replaying ``hcidump --raw hci`` output through the same reader it uses.
+
+Replay a recorded capture, or by default a generated one with a mix of single- and
+multi-report LE Advertising Reports, LE Extended Advertising Reports, and command
+packets. Run from the top of the repository::
+
+    python -m benchmarks.hcidump_replay [--capture FILE] [--repeat N]
+"""
+
+import argparse
+import io
+import random
+import struct
+import time
+
+from _bleio import hci
+from _bleio.scan_buffer import _ScanBuffer
+from _bleio.scan_entry import ScanEntry
+
+
+def hcidump_packet(direction, packet):
+    """Format a packet as hcidump --raw does: 20 bytes per line, continued indented."""
+    hex_bytes = [f"{byte:02X}" for byte in packet]
+    lines = [" ".join(hex_bytes[i : i + 20]) for i in range(0, len(hex_bytes), 20)]
+    return (f"{direction} " + "\n  ".join(lines) + "\n").encode()
+
+
+def le_meta_event(subevent_code, reports):
+    params = bytes((subevent_code, len(reports))) + b"".join(reports)
+    return bytes((0x04, 0x3E, len(params))) + params
+
+
+def advertising_report(rng):
+    data = b"\x02\x01\x06\x05\xff\x22\x08" + rng.randbytes(2) + b"\x03\x09ab"
+    return (
+        struct.pack("<BB6sB", rng.choice((0, 0, 3, 4)), 1, rng.randbytes(6), len(data))
+        + data
+        + struct.pack("b", rng.randrange(-100, -30))
+    )
+
+
+def extended_advertising_report(rng):
+    data = b"\x02\x01\x06\x11\x07" + rng.randbytes(16)
+    return (
+        struct.pack(
+            "<HB6sBBBbbHB6sB",
+            rng.choice((0x13, 0x1B, 0x00)),
+            1,
+            rng.randbytes(6),
+            1,
+            0,
+            0xFF,
+            127,
+            rng.randrange(-100, -30),
+            0,
+            0,
+            bytes(6),
+            len(data),
+        )
+        + data
+    )
+
+
+def generated_capture(packets):
+    rng = random.Random(0)
+    chunks = [b"HCI sniffer - Bluetooth packet analyzer ver 5.66\n", b"device: hci0\n"]
+    for _ in range(packets):
+        kind = rng.random()
+        if kind < 0.6:
+            event = le_meta_event(0x02, [advertising_report(rng)])
+        elif kind < 0.8:
+            event = le_meta_event(
+                0x02, [advertising_report(rng) for _ in range(rng.randint(2, 3))]
+            )
+        elif kind < 0.95:
+            event = le_meta_event(0x0D, [extended_advertising_report(rng)])
+        else:
+            # LE Set Scan Enable, and its Command Complete event.
+            chunks.append(hcidump_packet("<", b"\x01\x0c\x20\x02\x01\x00"))
+            event = b"\x04\x0e\x04\x01\x0c\x20\x00"
+        chunks.append(hcidump_packet(">", event))
+    return b"".join(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capture", help="file of recorded hcidump --raw hci output")
+    parser.add_argument("--packets", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.capture:
+        with open(args.capture, "rb") as capture_file:
+            capture = capture_file.read()
+    else:
+        capture = generated_capture(args.packets)
+    # pylint: disable=protected-access
+    matcher = ScanEntry._compile_prefixes(b"", match_all=False)
+
+    best = None
+    for _ in range(args.repeat):
+        scan_buffer = _ScanBuffer(1024, "drop_oldest")
+        start = time.perf_counter()
+        hci._read_hcidump(io.BytesIO(capture), scan_buffer, matcher, -128, True)
+        elapsed = time.perf_counter() - start
+        reports = scan_buffer.dropped
+        while scan_buffer.get(0) is not None:
+            reports += 1
+        if best is None or elapsed < best:
+            best = elapsed
+    print(
+        f"{len(capture)} bytes of hcidump output, {reports} advertising reports: "
+        f"{best * 1000:.1f} ms, {reports / best:,.0f} reports/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
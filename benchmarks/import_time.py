@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure how long ``import _bleio`` takes in a fresh interpreter, and how many threads
+are running after the import and after the adapter is first used.
+
+Run from the top of the repository::
+
+    python -m benchmarks.import_time [--runs N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Runs in a fresh interpreter, so nothing has been imported yet.
+_CHILD = """
+import json, threading, time
+start = time.perf_counter()
+import _bleio
+import_time = time.perf_counter() - start
+threads_after_import = threading.active_count()
+start = time.perf_counter()
+_bleio.adapter.await_bleak(__import__("asyncio").sleep(0))
+first_use_time = time.perf_counter() - start
+print(json.dumps([import_time, threads_after_import, first_use_time,
+                  threading.active_count()]))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    results = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", _CHILD],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(args.runs)
+    ]
+    import_times, threads_after_import, first_use_times, threads_after_use = zip(
+        *results
+    )
+    print(f"{args.runs} runs")
+    print(
+        f"import _bleio:        median {statistics.median(import_times) * 1000:7.2f} ms, "
+        f"{max(threads_after_import)} thread(s) running"
+    )
+    print(
+        f"first adapter use:    median {statistics.median(first_use_times) * 1000:7.2f} ms, "
+        f"{max(threads_after_use)} thread(s) running"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure scan prefix matching: 50 prefixes against 10,000 advertisements, with the
+matcher compiled once per scan, and with the prefixes separated and compared against every
+field for each advertisement, as ScanEntry.matches() used to do.
+
+Run from the top of the repository::
+
+    python -m benchmarks.prefix_matching [--prefixes N] [--adverts N]
+"""
+
+import argparse
+import random
+import time
+
+from _bleio.address import Address
+from _bleio.scan_entry import ScanEntry
+
+_ADDRESS = Address(string="01:02:03:04:05:06")
+
+
+def separate_fields(advertisement_bytes):
+    fields = []
+    i = 0
+    while i < len(advertisement_bytes):
+        length = advertisement_bytes[i]
+        i += 1
+        fields.append(advertisement_bytes[i : i + length])
+        i += length
+    return fields
+
+
+def uncompiled_matches(scan_entry, prefixes, match_all):
+    """The old ScanEntry.matches(): separate the prefixes and the fields every time."""
+    if len(prefixes) == 0:
+        return True
+    # pylint: disable=protected-access
+    fields = separate_fields(scan_entry.advertisement_bytes)
+    for prefix in ScanEntry._separate_prefixes(prefixes):
+        prefix_matched = False
+        for field in fields:
+            if field.startswith(prefix):
+                if not match_all:
+                    return True
+                prefix_matched = True
+                break
+        if not prefix_matched and match_all:
+            return False
+    return match_all
+
+
+def make_prefixes(rng, count):
+    """Manufacturer data company IDs and 16-bit service UUIDs, as scanning filters use."""
+    prefixes = []
+    for i in range(count):
+        if i % 2:
+            prefixes.append(b"\x03\xff" + rng.randbytes(2))
+        else:
+            prefixes.append(b"\x03\x03" + rng.randbytes(2))
+    return b"".join(prefixes)
+
+
+def make_adverts(rng, count):
+    adverts = []
+    for _ in range(count):
+        data = (
+            b"\x02\x01\x06"
+            + b"\x03\x03"
+            + rng.randbytes(2)
+            + b"\x07\xff"
+            + rng.randbytes(6)
+            + b"\x05\x09"
+            + rng.randbytes(4)
+        )
+        adverts.append(data)
+    return adverts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prefixes", type=int, default=50)
+    parser.add_argument("--adverts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    prefixes = make_prefixes(rng, args.prefixes)
+    adverts = make_adverts(rng, args.adverts)
+    print(f"{args.prefixes} prefixes, {args.adverts} advertisements")
+
+    for match_all in (False, True):
+        # Compiled once, as start_scan() does.
+        # pylint: disable=protected-access
+        matcher = ScanEntry._compile_prefixes(prefixes, match_all)
+        for name, matches in (
+            ("compiled", matcher.matches),
+            (
+                "uncompiled",
+                # pylint: disable-next=cell-var-from-loop
+                lambda entry: uncompiled_matches(entry, prefixes, match_all),
+            ),
+        ):
+            best = None
+            for _ in range(args.repeat):
+                # New entries each time, since each advertisement is only matched once.
+                scan_entries = [
+                    ScanEntry(
+                        address=_ADDRESS,
+                        rssi=-50,
+                        advertisement_bytes=data,
+                        connectable=True,
+                        scan_response=False,
+                    )
+                    for data in adverts
+                ]
+                start = time.perf_counter()
+                matched = sum(map(matches, scan_entries))
+                elapsed = time.perf_counter() - start
+                if best is None or elapsed < best:
+                    best = elapsed
+            print(
+                f"match_all={match_all!s:5} {name:10} {best * 1000:8.1f} ms, "
+                f"{args.adverts / best:>12,.0f} adverts/s, {matched} matched"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure the time to read a snapshot of a simulated sensor's characteristics,
+one Characteristic.value at a time and with Connection.read_many(),
+as the simulated per-read latency varies.
+
+Run from the top of the repository::
+
+    python -m benchmarks.read_many [--rounds N]
+"""
+
+import argparse
+import functools
+import statistics
+import time
+
+import _bleio
+
+from benchmarks import fakes
+
+
+def median_time(function, rounds):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    fakes.install(0.0)
+    connection = _bleio.adapter.connect(
+        _bleio.Address(string="AA:BB:CC:DD:EE:01"), timeout=10
+    )
+    characteristics = [
+        characteristic
+        for service in connection.discover_remote_services()
+        for characteristic in service.characteristics
+        if characteristic.properties & _bleio.Characteristic.READ
+    ]
+    print(f"{len(characteristics)} characteristics, median of {args.rounds} rounds")
+
+    for latency in (0.0, 0.005, 0.02):
+        fakes.FakeBleakClient.latency = latency
+        print(f"{latency * 1000:4.0f} ms per read:")
+        sequential = median_time(
+            lambda: [characteristic.value for characteristic in characteristics],
+            args.rounds,
+        )
+        print(f"  Characteristic.value each:      {sequential * 1000:8.2f} ms")
+        for max_concurrency in (None, 4, 1):
+            elapsed = median_time(
+                functools.partial(
+                    connection.read_many,
+                    characteristics,
+                    max_concurrency=max_concurrency,
+                ),
+                args.rounds,
+            )
+            print(
+                f"  read_many(max_concurrency={max_concurrency!s:4}): "
+                f"{elapsed * 1000:8.2f} ms"
+            )
+
+    connection.disconnect()
+
+
+if __name__ == "__main__":
+    main()
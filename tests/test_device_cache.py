@@ -0,0 +1,120 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Connecting to a scanned device reuses the BLEDevice found by the scan,
+and connecting to a connected device reuses its connection.
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from _bleio import common
+from _bleio.address import Address
+
+SCANNED_ADDRESS = "AA:BB:CC:DD:EE:01"
+
+
+class FakeBleakScanner:
+    """Reports one advertisement from each device in ``devices`` when started."""
+
+    devices = ()
+
+    def __init__(self, detection_callback=None, **_kwargs):
+        self._detection_callback = detection_callback
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        for device in self.devices:
+            advertisement_data = types.SimpleNamespace(
+                rssi=-50, manufacturer_data={}, service_uuids=[], local_name=None
+            )
+            loop.call_soon(self._detection_callback, device, advertisement_data)
+
+    async def stop(self):
+        pass
+
+
+class FakeBleakClient:
+    """Records what it is asked to connect to."""
+
+    instances = []
+
+    def __init__(self, address_or_ble_device, **kwargs):
+        self.address_or_ble_device = address_or_ble_device
+        self.kwargs = kwargs
+        self.is_connected = False
+        self.services = []
+        FakeBleakClient.instances.append(self)
+
+    async def connect(self, **_kwargs):
+        self.is_connected = True
+
+    async def disconnect(self):
+        self.is_connected = False
+
+
+@pytest.fixture(name="adapter")
+def fixture_adapter(monkeypatch):
+    device = types.SimpleNamespace(address=SCANNED_ADDRESS, name="scanned")
+    monkeypatch.setattr(FakeBleakScanner, "devices", (device,))
+    monkeypatch.setattr(FakeBleakClient, "instances", [])
+    monkeypatch.setattr(common, "BleakScanner", FakeBleakScanner)
+    monkeypatch.setattr(common, "BleakClient", FakeBleakClient)
+    monkeypatch.setattr(common.adapter, "ble_backend", "bleak")
+    monkeypatch.setattr(common.adapter, "_hcitool_is_usable", False)
+    common.adapter._clear_device_cache()
+    yield common.adapter
+    for connection in common.adapter.connections:
+        connection.disconnect()
+    common.adapter._clear_device_cache()
+
+
+def test_connect_uses_scanned_device(adapter):
+    scanned = list(adapter.start_scan(timeout=0.2))
+    assert [str(entry.address) for entry in scanned] == [
+        f'Address(string="{SCANNED_ADDRESS}")'
+    ]
+    hits = adapter.device_cache_stats["hits"]
+
+    # The cache is keyed by address value, so the case of the string does not matter.
+    connection = adapter.connect(Address(string=SCANNED_ADDRESS.lower()), timeout=1)
+
+    assert connection.connected
+    (client,) = FakeBleakClient.instances
+    assert client.address_or_ble_device is FakeBleakScanner.devices[0]
+    assert adapter.device_cache_stats["hits"] == hits + 1
+
+
+def test_connect_without_scan_uses_address(adapter):
+    misses = adapter.device_cache_stats["misses"]
+
+    adapter.connect(Address(string="11:22:33:44:55:66"), timeout=1)
+
+    (client,) = FakeBleakClient.instances
+    assert client.address_or_ble_device == "11:22:33:44:55:66"
+    assert adapter.device_cache_stats["misses"] == misses + 1
+
+
+def test_connect_reuses_live_connection(adapter):
+    address = Address(string="11:22:33:44:55:66")
+    connection = adapter.connect(address, timeout=1)
+
+    assert adapter.connect(address, timeout=1) is connection
+    assert len(FakeBleakClient.instances) == 1
+
+    connection.disconnect()
+    reconnection = adapter.connect(address, timeout=1)
+    assert reconnection is not connection
+    assert tuple(adapter.connections) == (reconnection,)
+
+
+def test_concurrent_connects_share_connection(adapter):
+    address = Address(string="11:22:33:44:55:66")
+    first, second = adapter.connect_many([address, address], timeout=1)
+
+    assert first is second
+    assert len(FakeBleakClient.instances) == 1
+    assert tuple(adapter.connections) == (first,)
@@ -0,0 +1,238 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Replay HCI event packets through a SOCK_SEQPACKET socket pair, which delivers
+one whole packet per receive, like a raw HCI socket.
+"""
+
+import socket
+import struct
+
+import pytest
+
+from _bleio import hci
+from _bleio.scan_buffer import _ScanBuffer
+from _bleio.scan_entry import ScanEntry
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs SOCK_SEQPACKET socket pairs"
+)
+
+ADV_DATA = b"\x02\x01\x06\x03\x09ab"
+SCAN_RESPONSE_DATA = b"\x05\xff\x22\x08\x01\x02"
+
+
+def le_meta_event(subevent_code, reports):
+    """An HCI LE meta-event packet, starting with its packet type byte."""
+    params = bytes((subevent_code, len(reports))) + b"".join(reports)
+    return bytes((0x04, 0x3E, len(params))) + params
+
+
+def advertising_report(event_type, address, data, rssi, address_type=0):
+    return (
+        struct.pack("<BB6sB", event_type, address_type, address, len(data))
+        + data
+        + struct.pack("b", rssi)
+    )
+
+
+def extended_advertising_report(event_type, address, data, rssi, address_type=0):
+    return (
+        struct.pack(
+            "<HB6sBBBbbHB6sB",
+            event_type,
+            address_type,
+            address,
+            1,  # LE 1M primary PHY
+            0,  # No secondary PHY
+            0xFF,  # No advertising SID
+            127,  # TX power not available
+            rssi,
+            0,  # No periodic advertising
+            0,
+            bytes(6),
+            len(data),
+        )
+        + data
+    )
+
+
+def replay(events, *, minimum_rssi=-80, active=True, prefixes=b""):
+    """Send events through a socket pair to _read_hci_socket(), and return the scan
+    entries it puts in the scan buffer.
+    """
+    scan_buffer = _ScanBuffer(64, "drop_oldest")
+    # pylint: disable=protected-access
+    matcher = ScanEntry._compile_prefixes(prefixes, match_all=False)
+    controller, host = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    with controller, host:
+        for event in events:
+            controller.send(event)
+        # Closing the other end ends the read.
+        controller.close()
+        hci._read_hci_socket(host, scan_buffer, matcher, minimum_rssi, active, 0.1)
+    assert scan_buffer.closed
+    scan_entries = []
+    while (scan_entry := scan_buffer.get(0)) is not None:
+        scan_entries.append(scan_entry)
+    return scan_entries
+
+
+def summary(scan_entry):
+    return (
+        scan_entry.address.string,
+        scan_entry.rssi,
+        scan_entry.connectable,
+        scan_entry.scan_response,
+        scan_entry.advertisement_bytes,
+    )
+
+
+def test_multiple_advertising_reports():
+    event = le_meta_event(
+        0x02,
+        [
+            advertising_report(0x00, b"\x01\x02\x03\x04\x05\x06", ADV_DATA, -40),
+            advertising_report(0x03, b"\x11\x12\x13\x14\x15\x16", b"", -50),
+            advertising_report(
+                0x04, b"\x01\x02\x03\x04\x05\x06", SCAN_RESPONSE_DATA, -41
+            ),
+        ],
+    )
+
+    assert [summary(entry) for entry in replay([event])] == [
+        ("06:05:04:03:02:01", -40, True, False, ADV_DATA),
+        ("16:15:14:13:12:11", -50, False, False, b""),
+        ("06:05:04:03:02:01", -41, False, True, SCAN_RESPONSE_DATA),
+    ]
+    # Passive scans drop scan responses.
+    assert [entry.rssi for entry in replay([event], active=False)] == [-40, -50]
+
+
+def test_extended_advertising_reports():
+    event = le_meta_event(
+        0x0D,
+        [
+            # Legacy ADV_IND: connectable, scannable.
+            extended_advertising_report(
+                0x0013, b"\x01\x02\x03\x04\x05\x06", ADV_DATA, -60
+            ),
+            # Scan response to a connectable, scannable advertisement.
+            extended_advertising_report(
+                0x001B, b"\x01\x02\x03\x04\x05\x06", SCAN_RESPONSE_DATA, -61
+            ),
+            # Extended non-connectable advertisement from a random address.
+            extended_advertising_report(
+                0x0000, b"\x21\x22\x23\x24\x25\xc6", ADV_DATA, -62, address_type=1
+            ),
+        ],
+    )
+
+    scan_entries = replay([event])
+
+    assert [summary(entry) for entry in scan_entries] == [
+        ("06:05:04:03:02:01", -60, True, False, ADV_DATA),
+        ("06:05:04:03:02:01", -61, True, True, SCAN_RESPONSE_DATA),
+        ("c6:25:24:23:22:21", -62, False, False, ADV_DATA),
+    ]
+    assert scan_entries[2].address.type == 1
+    assert [entry.rssi for entry in replay([event], active=False)] == [-60, -62]
+
+
+def test_anonymous_extended_advertisement_is_skipped():
+    event = le_meta_event(
+        0x0D,
+        [
+            extended_advertising_report(0x0000, bytes(6), ADV_DATA, -50, 0xFF),
+            extended_advertising_report(
+                0x0000, b"\x01\x02\x03\x04\x05\x06", ADV_DATA, -51
+            ),
+        ],
+    )
+
+    assert [entry.rssi for entry in replay([event])] == [-51]
+
+
+def test_truncated_events():
+    first = advertising_report(0x00, b"\x01\x02\x03\x04\x05\x06", ADV_DATA, -40)
+    second = advertising_report(0x00, b"\x11\x12\x13\x14\x15\x16", ADV_DATA, -50)
+    # Says it has two reports, but the second one is cut off before its RSSI.
+    cut_short = le_meta_event(0x02, [first, second])[:-1]
+    # Cut off in the middle of the first report's fixed fields.
+    cut_in_header = le_meta_event(0x02, [first])[:8]
+    extended = extended_advertising_report(
+        0x0000, b"\x21\x22\x23\x24\x25\x26", ADV_DATA, -60
+    )
+    cut_extended = le_meta_event(0x0D, [extended])[:20]
+    too_short = b"\x04\x3e\x01"
+    complete = le_meta_event(0x02, [second])
+
+    scan_entries = replay([cut_short, cut_in_header, cut_extended, too_short, complete])
+
+    # The reports before the cut are kept, and later events are still read.
+    assert [entry.rssi for entry in scan_entries] == [-40, -50]
+
+
+def test_filters_and_other_events():
+    # HCI Command Complete event, not an advertising report.
+    command_complete = b"\x04\x0e\x04\x01\x0c\x20\x00"
+    # LE Connection Complete subevent.
+    connection_complete = le_meta_event(0x01, [])
+    event = le_meta_event(
+        0x02,
+        [
+            advertising_report(0x00, b"\x01\x02\x03\x04\x05\x06", ADV_DATA, -40),
+            # Too weak.
+            advertising_report(0x00, b"\x11\x12\x13\x14\x15\x16", ADV_DATA, -90),
+            # RSSI not available.
+            advertising_report(0x00, b"\x21\x22\x23\x24\x25\x26", ADV_DATA, 127),
+            # Does not match the prefix.
+            advertising_report(0x00, b"\x31\x32\x33\x34\x35\x36", b"\x02\x01\x06", -40),
+        ],
+    )
+
+    scan_entries = replay(
+        [command_complete, connection_complete, event], prefixes=b"\x03\x09ab"
+    )
+
+    assert [entry.address.string for entry in scan_entries] == ["06:05:04:03:02:01"]
+
+
+def run_hci_command(replies):
+    """Run LE Set Scan Enable with _run_hci_command(), with replies queued up from
+    the controller, and return the command packet it sent.
+    """
+    controller, host = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    with controller, host:
+        for reply in replies:
+            controller.send(reply)
+        host.settimeout(1)
+        try:
+            # pylint: disable=protected-access
+            hci._run_hci_command(host, 0x200C, b"\x01\x00")
+        finally:
+            command = controller.recv(16)
+    return command
+
+
+def test_hci_command_complete():
+    command = run_hci_command(
+        [
+            le_meta_event(0x02, []),
+            # Command Complete for another command.
+            b"\x04\x0e\x04\x01\x0b\x20\x0c",
+            # Command Complete for LE Set Scan Enable, with success.
+            b"\x04\x0e\x04\x01\x0c\x20\x00",
+        ]
+    )
+    assert command == b"\x01\x0c\x20\x02\x01\x00"
+
+
+def test_hci_command_failure_raises():
+    # Command Status for LE Set Scan Enable, with Command Disallowed.
+    with pytest.raises(EnvironmentError, match="0x200C failed with status 0x0C"):
+        run_hci_command([b"\x04\x0f\x04\x0c\x01\x0c\x20"])
+    # Command Complete, with Command Disallowed.
+    with pytest.raises(EnvironmentError, match="0x200C failed with status 0x0C"):
+        run_hci_command([b"\x04\x0e\x04\x01\x0c\x20\x0c"])
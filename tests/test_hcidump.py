@@ -0,0 +1,53 @@
+# SPDX-FileCopyrightText: Copyright (c) 2020 Dan Halbert for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Replay hcidump --raw hci output through the hcitool backend's reader."""
+
+import io
+import struct
+
+from _bleio import hci
+from _bleio.scan_buffer import _ScanBuffer
+from _bleio.scan_entry import ScanEntry
+
+HEADER = b"HCI sniffer - Bluetooth packet analyzer ver 5.66\ndevice: hci0\n"
+
+
+def hcidump_packet(direction, packet):
+    """Format a packet as hcidump --raw does: 20 bytes per line, continued indented."""
+    hex_bytes = [f"{byte:02X}" for byte in packet]
+    lines = [" ".join(hex_bytes[i : i + 20]) for i in range(0, len(hex_bytes), 20)]
+    return (f"{direction} " + "\n  ".join(lines) + "\n").encode()
+
+
+def advertising_report_event(address, rssi):
+    data = b"\x02\x01\x06\x03\x09ab"
+    report = (
+        struct.pack("<BB6sB", 0, 0, address, len(data)) + data + struct.pack("b", rssi)
+    )
+    params = bytes((0x02, 1)) + report
+    return bytes((0x04, 0x3E, len(params))) + params
+
+
+def replay(output):
+    scan_buffer = _ScanBuffer(16, "drop_oldest")
+    # pylint: disable=protected-access
+    matcher = ScanEntry._compile_prefixes(b"", match_all=False)
+    hci._read_hcidump(io.BytesIO(output), scan_buffer, matcher, -128, True)
+    scan_entries = []
+    scan_entry = scan_buffer.get(0)
+    while scan_entry is not None:
+        scan_entries.append(scan_entry)
+        scan_entry = scan_buffer.get(0)
+    return scan_entries
+
+
+def test_last_packet_is_parsed_at_eof():
+    output = (
+        HEADER
+        + hcidump_packet(">", advertising_report_event(bytes(range(1, 7)), -40))
+        + hcidump_packet(">", advertising_report_event(bytes(range(2, 8)), -60))
+    )
+    scan_entries = replay(output)
+    assert [scan_entry.rssi for scan_entry in scan_entries] == [-40, -60]